@@ -4,6 +4,15 @@
 #    api_url: "https://api.openshift.com"      # Optional: OpenShift API URL, if None it will OpenShift that you are logged in
 #    token: "KUADRANT_RULEZ"                   # Optional: OpenShift Token, if None it will OpenShift that you are logged in
 #    kubeconfig_path: "~/.kube/config"         # Optional: Kubeconfig to use, if None the default one is used
+#  namespaces: ["marin3r-1", "marin3r-2"]  # Optional: Pool of namespaces for --sharding=pool, one per xdist worker
+#  rate_limit:                              # Optional: Client-side limit of oc invocations per process
+#    rate: 10                               # Invocations per second, has to be positive
+#    burst: 20                              # Invocations allowed at once
 #  cfssl: "cfssl"  # Path to the CFSSL library for TLS tests
+#  prepull:                                 # Required by --prepull, pin images by digest, use mirrors in disconnected clusters
+#    busybox_image: "docker.io/library/busybox@sha256:<digest>"  # Static busybox, which runs in init containers pulling images
+#    pause_image: "registry.k8s.io/pause@sha256:<digest>"        # Keeps the DaemonSet pods running after the pull
+#  marin3r_version: "v0.13.0"  # Optional: Version of Marin3r under test, stored together with --baseline metrics
+#  startup_budget: 1.0  # Optional: Maximum time in seconds for importing testsuite and loading settings
 #  envoy:
 #    image: "docker.io/envoyproxy/envoy:v1.23-latest"  # Envoy image that should be deployed
\ No newline at end of file
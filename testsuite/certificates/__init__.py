@@ -20,6 +20,7 @@ class CertInfo:
     ca: bool = False
     children: Optional[Dict[str, Optional["CertInfo"]]] = None
     names: Optional[List[Dict[str, str]]] = None
+    key: Optional[Dict[str, Any]] = None  # Key algorithm, e.g. {"algo": "ecdsa", "size": 256}
 
 
 @dataclasses.dataclass
@@ -93,6 +94,7 @@ class CFSSLClient:
         common_name: str,
         names: Optional[List[Dict[str, str]]] = None,
         hosts: Optional[Collection[str]] = None,
+        key: Optional[Dict[str, Any]] = None,
     ) -> UnsignedKey:
         """Generates unsigned key"""
         data: Dict[str, Any] = {"CN": common_name}
@@ -100,6 +102,8 @@ class CFSSLClient:
             data["names"] = names
         if hosts:
             data["hosts"] = hosts
+        if key:
+            data["key"] = key
 
         result = self._execute_command("genkey", "-", stdin=json.dumps(data))
         return UnsignedKey(key=result["key"], csr=result["csr"])
@@ -144,6 +148,7 @@ class CFSSLClient:
         hosts: Collection[str],
         names: Optional[List[Dict[str, str]]] = None,
         certificate_authority: Optional[Certificate] = None,
+        key: Optional[Dict[str, Any]] = None,
     ) -> Certificate:
         """Generates self-signed root or intermediate CA certificate and private key
         Args:
@@ -151,13 +156,14 @@ class CFSSLClient:
             :param hosts: list of hosts
             :param names: dict of all names
             :param certificate_authority: Optional Authority to sign this new authority, making it intermediate
+            :param key: Key algorithm, RSA 4096 by default
         """
         names = names or self.DEFAULT_NAMES
         data = {
             "CN": common_name,
             "names": names,
             "hosts": hosts,
-            "key": {"algo": "rsa", "size": 4096},
+            "key": key or {"algo": "rsa", "size": 4096},
         }
 
         result = self._execute_command("genkey", "-initca", "-", stdin=json.dumps(data))
@@ -173,6 +179,7 @@ class CFSSLClient:
         hosts: Collection[str],
         certificate_authority: Certificate,
         names: Optional[List[Dict[str, str]]] = None,
+        key: Optional[Dict[str, Any]] = None,
     ) -> Certificate:
         """Create a new certificate.
         Args:
@@ -180,8 +187,9 @@ class CFSSLClient:
             :param hosts: Hosts field in the csr
             :param names: Names field in the csr
             :param certificate_authority: Certificate Authority to be used for signing
+            :param key: Key algorithm, CFSSL default (ECDSA 256) if not set
         """
         names = names or self.DEFAULT_NAMES
-        key = self.generate_key(common_name, names, hosts)
-        certificate = self.sign(key, certificate_authority=certificate_authority)
+        unsigned = self.generate_key(common_name, names, hosts, key)
+        certificate = self.sign(unsigned, certificate_authority=certificate_authority)
         return certificate
@@ -1,7 +1,32 @@
 """Custom dynaconf loader for loading OpenShift settings and converting them to OpenshiftClients"""
 from weakget import weakget
 
-from testsuite.openshift.client import OpenShiftClient
+
+class LazyOpenShiftClient:
+    """
+    OpenShiftClient which is created on the first access,
+    so loading settings doesn't import the whole openshift-client stack
+    """
+
+    def __init__(self, project: str, api_url: str = None, token: str = None, kubeconfig_path: str = None) -> None:
+        self._args = (project, api_url, token, kubeconfig_path)
+        self._client = None
+
+    @property
+    def client(self):
+        """Returns the real OpenShiftClient"""
+        if self._client is None:
+            # pylint: disable=import-outside-toplevel
+            from testsuite.openshift.client import OpenShiftClient
+
+            self._client = OpenShiftClient(*self._args)
+        return self._client
+
+    def __getattr__(self, name):
+        # Dynaconf and copy probe for private and special attributes, those must not create the client
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.client, name)
 
 
 # pylint: disable=unused-argument
@@ -9,7 +34,7 @@ def load(obj, env=None, silent=True, key=None, filename=None):
     """Creates all OpenShift clients"""
     config = weakget(obj)
     section = config["openshift"]
-    client = OpenShiftClient(
+    client = LazyOpenShiftClient(
         section["project"] % None,
         section["api_url"] % None,
         section["token"] % None,
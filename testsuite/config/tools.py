@@ -8,12 +8,15 @@ def fetch_route(name, force_http=False):
     """Fetches the URL of a route with specific name"""
 
     def _fetcher(settings, _):
-        try:
-            openshift = settings["tools"]
+        def _fetch():
             route = openshift.routes[name]
             if not force_http and "tls" in route.model.spec:
                 return "https://" + route.model.spec.host
             return "http://" + route.model.spec.host
+
+        try:
+            openshift = settings["tools"]
+            return openshift.fact(f"route/{name}/{force_http}", _fetch)
         # pylint: disable=broad-except
         except Exception:
             logger.warning("Unable to fetch route %s from tools", name)
@@ -28,7 +31,7 @@ def fetch_secret(name, key):
     def _fetcher(settings, _):
         try:
             openshift = settings["tools"]
-            return openshift.secrets[name][key]
+            return openshift.fact(f"secret/{name}/{key}", lambda: openshift.secrets[name][key], private=True)
         # pylint: disable=broad-except
         except Exception:
             logger.warning("Unable to fetch secret %s[%s] from tools", name, key)
@@ -1,11 +1,17 @@
 """Common classes for Httpx"""
+import dataclasses
+import random
+import time
+from collections import defaultdict
 from tempfile import NamedTemporaryFile
-from typing import Union
+from typing import Callable, Optional, Union
 
 import backoff
-from httpx import Client, Response
+import pytest
+from httpx import Client, ConnectError, Response
 
 from testsuite.certificates import Certificate
+from testsuite.perf.trace import TRACER
 
 
 def create_tmp_file(content: str):
@@ -26,6 +32,88 @@ class UnexpectedResponse(Exception):
         self.response = response
 
 
+def router_not_admitted(response: Response) -> bool:
+    """Route which wasn't admitted by the router yet returns 404 with the default router page"""
+    return response.status_code == 404 and "Application is not available" in response.text
+
+
+@dataclasses.dataclass
+class RetryPolicy:
+    """Retries requests with exponential backoff and jitter until the overall deadline (in seconds) passes"""
+
+    deadline: float = 30
+    initial_delay: float = 0.1
+    max_delay: float = 5
+    jitter: float = 0.5  # Fraction of the delay which is randomized
+    exceptions: tuple = (ConnectError,)
+    rules: tuple[Callable[[Response], bool], ...] = (router_not_admitted,)
+
+    def reason(self, response: Response, retry_codes) -> Optional[str]:
+        """Returns why the response should be retried, None if it shouldn't"""
+        if response.status_code in retry_codes:
+            return str(response.status_code)
+        for rule in self.rules:
+            if rule(response):
+                return rule.__name__
+        return None
+
+    def _jitter(self, value: float) -> float:
+        return value * (1 - self.jitter * random.random())
+
+    def wrap(self, func, on_backoff):
+        """Returns func retried according to this policy"""
+        return backoff.on_exception(
+            backoff.expo,
+            (UnexpectedResponse, *self.exceptions),
+            max_time=self.deadline,
+            jitter=self._jitter,
+            on_backoff=on_backoff,
+            factor=self.initial_delay,
+            max_value=self.max_delay,
+        )(func)
+
+
+class RetryReport:
+    """Time spent waiting between retries by all clients, per reason of the retry"""
+
+    def __init__(self) -> None:
+        self.retries: dict[str, int] = defaultdict(int)
+        self.waited: dict[str, float] = defaultdict(float)
+
+    def add(self, reason: str, wait: float):
+        """Records single retry"""
+        self.retries[reason] += 1
+        self.waited[reason] += wait
+
+    def export(self) -> dict:
+        """Returns report in a serializable form"""
+        return {"retries": dict(self.retries), "waited": dict(self.waited)}
+
+    def merge(self, data: dict):
+        """Merges report exported by a different process, e.g. xdist worker"""
+        for reason, count in data.get("retries", {}).items():
+            self.retries[reason] += count
+        for reason, wait in data.get("waited", {}).items():
+            self.waited[reason] += wait
+
+
+RETRY_REPORT = RetryReport()
+
+
+class LatencyLog:
+    """Latencies (in seconds) of all responses received by HTTP clients of this process"""
+
+    def __init__(self) -> None:
+        self.samples: list[float] = []
+
+    def add(self, latency: float):
+        """Records latency of a single response"""
+        self.samples.append(latency)
+
+
+LATENCIES = LatencyLog()
+
+
 class HttpxBackoffClient(Client):
     """Httpx client which retries unstable requests"""
 
@@ -34,10 +122,15 @@ class HttpxBackoffClient(Client):
         *,
         verify: Union[Certificate, bool] = True,
         cert: Certificate = None,
+        retry_policy: Optional[RetryPolicy] = None,
         **kwargs,
     ):
         self.files = []
         self.retry_codes = {503}
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_time = 0.0
+        self.created = time.time()
+        self.responded = False
         _verify = None
         if isinstance(verify, Certificate):
             verify_file = create_tmp_file(verify.certificate)
@@ -64,7 +157,17 @@ class HttpxBackoffClient(Client):
         """Add a new retry code to"""
         self.retry_codes.add(code)
 
-    @backoff.on_exception(backoff.fibo, UnexpectedResponse, max_tries=8, jitter=None)
+    def _on_backoff(self, details):
+        exception = details["exception"]
+        if isinstance(exception, UnexpectedResponse):
+            reason = self.retry_policy.reason(exception.response, self.retry_codes) or "unexpected"
+        else:
+            reason = type(exception).__name__
+        self.retry_time += details["wait"]
+        RETRY_REPORT.add(reason, details["wait"])
+        now = time.time()
+        TRACER.add("retry", now, now + details["wait"], "http", reason=reason)
+
     def request(
         self,
         method: str,
@@ -82,7 +185,7 @@ class HttpxBackoffClient(Client):
         timeout=None,
         extensions=None,
     ) -> Response:
-        response = super().request(
+        return self.retry_policy.wrap(self._request, self._on_backoff)(
             method,
             url,
             content=content,
@@ -97,6 +200,40 @@ class HttpxBackoffClient(Client):
             timeout=timeout,
             extensions=extensions,
         )
-        if response.status_code in self.retry_codes:
+
+    def _request(self, method: str, url, **kwargs) -> Response:
+        """Sends single request, raises UnexpectedResponse if the response should be retried"""
+        response = super().request(method, url, **kwargs)
+        LATENCIES.add(response.elapsed.total_seconds())
+        if self.retry_policy.reason(response, self.retry_codes):
             raise UnexpectedResponse(f"Didn't expect '{response.status_code}' status code", response)
+        if not self.responded:
+            self.responded = True
+            TRACER.add("first response", self.created, time.time(), "http", status=response.status_code)
         return response
+
+
+class RetryReportPlugin:
+    """Pytest plugin, which reports time HTTP clients spent waiting between retries"""
+
+    def __init__(self, report: RetryReport) -> None:
+        self.report = report
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):  # pylint: disable=unused-argument
+        """Collects retries from xdist workers"""
+        self.report.merge(getattr(node, "workeroutput", {}).get("http_retries", {}))
+
+    def pytest_sessionfinish(self, session):
+        """Exports retries to xdist controller"""
+        if hasattr(session.config, "workeroutput"):
+            session.config.workeroutput["http_retries"] = self.report.export()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Prints number of retries and time spent waiting per reason"""
+        if not self.report.retries:
+            return
+        terminalreporter.write_sep("=", "HTTP retries")
+        terminalreporter.write_line(f"{'reason':40} {'retries':>7} {'waited[s]':>9}")
+        for reason, waited in sorted(self.report.waited.items(), key=lambda x: -x[1]):
+            terminalreporter.write_line(f"{reason:40} {self.report.retries[reason]:7} {waited:9.2f}")
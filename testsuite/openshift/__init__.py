@@ -3,6 +3,8 @@ import abc
 
 from openshift import APIObject
 
+from testsuite.perf.api import API_RECORDER
+
 
 class LifecycleObject(abc.ABC):
     """Any objects which has its lifecycle controlled by create() and delete() methods"""
@@ -32,10 +34,20 @@ class OpenShiftObject(APIObject):
         Creates object on the server and returns created entity.
         It will be the same class but attributes might differ, due to server adding/rejecting some of them.
         """
-        self.create(["--save-config=true"])
-        self.committed = True
-        return self.refresh()
+        with API_RECORDER.operation(f"commit {self.kind()}"):
+            self.create(["--save-config=true"])
+            self.committed = True
+            return self.refresh()
 
     def delete(self, ignore_not_found=True, cmd_args=None):
         """Deletes the resource, by default ignored not found"""
-        return super().delete(ignore_not_found, cmd_args)
+        with API_RECORDER.operation(f"delete {self.kind()}"):
+            return super().delete(ignore_not_found, cmd_args)
+
+    def refresh(self):
+        with API_RECORDER.operation(f"refresh {self.kind()}"):
+            return super().refresh()
+
+    def modify_and_apply(self, modifier_func, retries=2, cmd_args=None, **kwargs):
+        with API_RECORDER.operation(f"modify_and_apply {self.kind()}"):
+            return super().modify_and_apply(modifier_func, retries, cmd_args, **kwargs)
@@ -7,9 +7,15 @@ from typing import Dict, Optional
 from urllib.parse import urlparse
 
 import openshift as oc
-from openshift import Context, Selector, OpenShiftPythonException
+from openshift import Selector, OpenShiftPythonException
 
 from testsuite.certificates import Certificate
+from testsuite.openshift import template
+from testsuite.openshift.facts import FACTS
+from testsuite.openshift.ratelimit import LimitedContext
+from testsuite.openshift.replay import ReplayContext
+from testsuite.perf.api import API_RECORDER, operation
+from testsuite.perf.cassette import CASSETTE
 
 
 class ServiceTypes(enum.Enum):
@@ -46,20 +52,37 @@ class OpenShiftClient:
     @cached_property
     def context(self):
         """Prepare context for command execution"""
-        context = Context()
+        context = ReplayContext() if CASSETTE.replaying else LimitedContext()
 
         context.project_name = self._project
         context.api_url = self._api_url
         context.token = self.token
         context.kubeconfig_path = self._kubeconfig_path
+        # Every oc invocation made within this context is recorded
+        context.tracking_strategy = CASSETTE.track(API_RECORDER)
 
         return context
 
+    def fact(self, name: str, fetch, private: bool = False):
+        """
+        Returns fact about the cluster (or project) this client points to, fetches it only if it isn't cached.
+        Private facts (e.g. secrets) are cached only in memory of this process.
+        """
+        return FACTS.get(f"{self._kubeconfig_path}|{self._api_url}|{self._project}|{name}", fetch, private)
+
+    def invalidate_facts(self):
+        """Forgets all cached facts about this client"""
+        FACTS.invalidate(f"{self._kubeconfig_path}|{self._api_url}|{self._project}|")
+
     @property
     def api_url(self):
         """Returns real API url"""
-        with self.context:
-            return oc.whoami("--show-server=true")
+
+        def _fetch():
+            with self.context:
+                return oc.whoami("--show-server=true")
+
+        return self.fact("api_url", _fetch)
 
     @cached_property
     def apps_url(self):
@@ -70,17 +93,25 @@ class OpenShiftClient:
     @property
     def project(self):
         """Returns real OpenShift project name"""
-        with self.context:
-            return oc.get_project_name()
+
+        def _fetch():
+            with self.context:
+                return oc.get_project_name()
+
+        return self.fact("project", _fetch)
 
     @property
     def connected(self):
         """Returns True, if user is logged in and the project exists"""
-        try:
-            self.do_action("status")
-        except OpenShiftPythonException:
-            return False
-        return True
+
+        def _fetch():
+            try:
+                self.do_action("status")
+            except OpenShiftPythonException:
+                return None
+            return True
+
+        return bool(self.fact("connected", _fetch))
 
     def do_action(self, verb: str, *args, auto_raise: bool = True, parse_output: bool = False):
         """Run an oc command."""
@@ -90,6 +121,18 @@ class OpenShiftClient:
                 return oc.APIObject(string_to_model=result.out())
             return result
 
+    @operation("new_project")
+    def new_project(self, name: str) -> "OpenShiftClient":
+        """Creates new project and returns client for it, current project of the user is not changed"""
+        with self.context:
+            oc.create({"apiVersion": "project.openshift.io/v1", "kind": "ProjectRequest", "metadata": {"name": name}})
+        return self.change_project(name)
+
+    @operation("delete_project")
+    def delete_project(self):
+        """Deletes the project together with everything in it, doesn't wait for the deletion to finish"""
+        self.do_action("delete", f"project/{self.project}", "--wait=false", "--ignore-not-found=true")
+
     @property
     def project_exists(self):
         """Returns True if the project exists"""
@@ -99,6 +142,7 @@ class OpenShiftClient:
         except oc.OpenShiftPythonException:
             return False
 
+    @operation("new_app")
     def new_app(self, source, params: Dict[str, str] = None):
         """Create application based on source code.
 
@@ -106,18 +150,30 @@ class OpenShiftClient:
             :param source: The source of the template, it must be either an url or a path to a local file.
             :param params: The parameters to be passed to the source when building it.
         """
+        if os.path.isfile(source):
+            return self.new_apps(source, [params or {}])[0]
+
         opt_args = []
         if params:
             opt_args.extend([f"--param={n}={v}" for n, v in params.items()])
-
-        if os.path.isfile(source):
-            source = f"--filename={source}"
-            opt_args.append("--local=true")
         objects = self.do_action("process", source, opt_args).out()
         with self.context:
             created = oc.create(objects)
         return created
 
+    @operation("new_apps")
+    def new_apps(self, path, params: list[Dict[str, str]]) -> list[Selector]:
+        """
+        Creates multiple applications from the template in a local file in a single call,
+        template is rendered locally. Returns selector for the objects of every application.
+        """
+        rendered = [template.render(path, app_params) for app_params in params]
+        with self.context:
+            # oc create lists created objects in the same order as they were sent
+            created = iter(oc.create([obj for objects in rendered for obj in objects]).qnames())
+            return [oc.selector([next(created) for _ in objects]) for objects in rendered]
+
+    @operation("is_ready")
     def is_ready(self, selector: Selector):
         """
         Returns true, if the selector pointing to Deployments or DeploymentConfigs are ready
@@ -129,13 +185,9 @@ class OpenShiftClient:
         )
         return success
 
-    def create_tls_secret(
-        self,
-        name: str,
-        certificate: Certificate,
-        labels: Optional[Dict[str, str]] = None,
-    ):
-        """Creates a TLS secret"""
+    @staticmethod
+    def _tls_secret(name: str, certificate: Certificate, labels: Optional[Dict[str, str]] = None) -> Dict:
+        """Returns model of a TLS secret"""
         model: Dict = {
             "kind": "Secret",
             "apiVersion": "v1",
@@ -150,9 +202,29 @@ class OpenShiftClient:
         }
         if labels is not None:
             model["metadata"]["labels"] = labels
+        return model
 
+    @operation("create_tls_secret")
+    def create_tls_secret(
+        self,
+        name: str,
+        certificate: Certificate,
+        labels: Optional[Dict[str, str]] = None,
+    ):
+        """Creates a TLS secret"""
+        with self.context:
+            return oc.create(self._tls_secret(name, certificate, labels), ["--save-config=true"])
+
+    @operation("update_tls_secret")
+    def update_tls_secret(
+        self,
+        name: str,
+        certificate: Certificate,
+        labels: Optional[Dict[str, str]] = None,
+    ):
+        """Replaces content of an existing TLS secret, e.g. to rotate the certificate"""
         with self.context:
-            return oc.create(model, ["--save-config=true"])
+            return oc.apply(self._tls_secret(name, certificate, labels))
 
     def delete_selector(self, selector, ignore_not_found=True):
         """Deletes all resources from selectior"""
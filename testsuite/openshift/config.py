@@ -2,12 +2,15 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 from functools import cached_property
+from typing import Optional
 
 import openshift as oc
 import yaml
 
 from testsuite.openshift import OpenShiftObject
 from testsuite.openshift.client import OpenShiftClient
+from testsuite.openshift import validation
+from testsuite.perf.api import operation
 
 
 def convert_to_yaml(data: list[str | dict]):
@@ -42,8 +45,9 @@ class BaseEnvoyConfig(OpenShiftObject, ABC):
         scoped_routes=None,
         secrets=None,
         labels=None,
+        node_id=None,
     ):
-        """Creates new EnvoyConfig instance"""
+        """Creates new EnvoyConfig instance, node_id defaults to its name"""
 
     @property
     @abstractmethod
@@ -58,6 +62,37 @@ class BaseEnvoyConfig(OpenShiftObject, ABC):
             ports[listener["name"]] = listener["address"]["socket_address"]["port_value"]
         return ports
 
+    def validate(self):
+        """Validates all resources locally, raises InvalidConfig if any of them would be rejected"""
+        errors = validation.validate(self.as_dict())
+        if errors:
+            raise validation.InvalidConfig(errors)
+
+    def commit(self, validate=True):
+        """Creates the EnvoyConfig, validates it locally first unless disabled"""
+        if validate:
+            self.validate()
+        return super().commit()
+
+    def modify_and_apply(self, modifier_func, retries=2, cmd_args=None, validate=True, **kwargs):
+        """Modifies and applies the EnvoyConfig, modified config is validated locally before applying unless disabled"""
+        if not validate:
+            return super().modify_and_apply(modifier_func, retries, cmd_args, **kwargs)
+
+        def _modify(obj, **modifier_kwargs):
+            result = modifier_func(obj, **modifier_kwargs)
+            if result is not False:
+                obj.validate()
+            return result
+
+        return super().modify_and_apply(_modify, retries, cmd_args, **kwargs)
+
+    @property
+    def published_version(self) -> str:
+        """Returns version of the config that is currently published to Envoys, refreshes the object"""
+        return self.refresh().model.status.publishedVersion
+
+    @operation("wait_status")
     def wait_status(self, status: Status, timeout=60):
         """Waits until config has the expected status"""
         with oc.timeout(timeout):
@@ -68,6 +103,26 @@ class BaseEnvoyConfig(OpenShiftObject, ABC):
             success, _, _ = self.self_selector().until_all(success_func=_status)
             return success
 
+    @operation("wait_published")
+    def wait_published(self, previous_version: Optional[str], timeout=60):
+        """
+        Waits until config is InSync and publishes the desired version, which differs from the previous one.
+        Previous version is None for a newly created config.
+        """
+        with oc.timeout(timeout):
+
+            def _published(obj):
+                status = obj.model.status
+                return (
+                    status.cacheState == self.Status.InSync.value
+                    and status.publishedVersion
+                    and status.publishedVersion != previous_version
+                    and status.publishedVersion == status.desiredVersion
+                )
+
+            success, _, _ = self.self_selector().until_all(success_func=_published)
+            return success
+
 
 class LegacyEnvoyConfig(BaseEnvoyConfig):
     """Legacy EnvoyConfig resource, using envoyResources field"""
@@ -85,6 +140,7 @@ class LegacyEnvoyConfig(BaseEnvoyConfig):
         scoped_routes=None,
         secrets=None,
         labels=None,
+        node_id=None,
     ):
         """Creates new EnvoyConfig"""
         model = {
@@ -92,7 +148,7 @@ class LegacyEnvoyConfig(BaseEnvoyConfig):
             "kind": "EnvoyConfig",
             "metadata": {"name": name},
             "spec": {
-                "nodeID": name,
+                "nodeID": node_id or name,
                 "serialization": "yaml",
                 "envoyResources": {
                     "clusters": convert_to_yaml(clusters or []),
@@ -136,6 +192,7 @@ class EnvoyConfig(BaseEnvoyConfig):
         scoped_routes=None,
         secrets=None,
         labels=None,
+        node_id=None,
     ):
         """Creates new instance"""
         model = {
@@ -143,7 +200,7 @@ class EnvoyConfig(BaseEnvoyConfig):
             "kind": "EnvoyConfig",
             "metadata": {"name": name},
             "spec": {
-                "nodeID": name,
+                "nodeID": node_id or name,
                 "serialization": "yaml",
                 "resources": [],
             },
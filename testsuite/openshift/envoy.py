@@ -1,4 +1,9 @@
 """Module containing all classes related to Envoy configured by Marin3r"""
+import json
+import time
+from collections import defaultdict
+from functools import cached_property
+from typing import Optional
 
 import openshift as oc
 
@@ -7,7 +12,12 @@ from testsuite.openshift import OpenShiftObject, LifecycleObject
 from testsuite.openshift.client import OpenShiftClient
 from testsuite.openshift.config import LegacyEnvoyConfig
 from testsuite.openshift.httpbin import Httpbin
+from testsuite.openshift.lease import Leases
+from testsuite.openshift.pods import pod_events, startup_breakdown
 from testsuite.openshift.route import Route
+from testsuite.perf.api import operation
+from testsuite.perf.trace import TRACER
+from testsuite.utils import worker_index
 
 
 class DiscoveryService(OpenShiftObject):
@@ -27,6 +37,21 @@ class DiscoveryService(OpenShiftObject):
 
         return cls(model, context=openshift.context)
 
+    @classmethod
+    def attach(cls, openshift: OpenShiftClient, name):
+        """Returns DiscoveryService which already exists (e.g. created by a different xdist worker)"""
+        with openshift.context:
+            service = oc.selector(f"discoveryservice/{name}").object(cls=cls)
+        service.committed = True
+        return service
+
+    @classmethod
+    def healthy(cls, openshift: OpenShiftClient, name) -> bool:
+        """Returns True if the DiscoveryService exists and isn't being deleted"""
+        with openshift.context:
+            service = oc.selector(f"discoveryservice/{name}").object(ignore_not_found=True)
+        return service is not None and not service.model.metadata.deletionTimestamp
+
 
 class EnvoyDeployment(OpenShiftObject):
     """Envoy deployed from template"""
@@ -60,6 +85,7 @@ class EnvoyDeployment(OpenShiftObject):
 
         return cls(model, context=openshift.context)
 
+    @operation("wait_deployment")
     def wait(self):
         """Waits until the deployment is ready"""
         with self.context, oc.timeout(120):
@@ -69,9 +95,25 @@ class EnvoyDeployment(OpenShiftObject):
             return success
 
 
+def _xds_versions(config_dump: dict) -> set[str]:
+    """Returns versions of all dynamic xDS resources which are loaded in the Envoy config_dump"""
+    versions = set()
+    for config in config_dump.get("configs", []):
+        for key, resources in config.items():
+            if not key.startswith("dynamic_active") and key not in ("dynamic_listeners", "dynamic_route_configs"):
+                continue
+            for resource in resources:
+                # Listeners have their version in active_state, missing active_state means it is not loaded yet
+                versions.add(resource.get("version_info", resource.get("active_state", {}).get("version_info", "")))
+    return versions
+
+
 class Envoy(LifecycleObject):
     """Envoy instance deployed through EnvoyDeployment"""
 
+    ADMIN_PORT = 9901
+    POLL_PERIOD = 0.5
+
     def __init__(
         self,
         openshift: OpenShiftClient,
@@ -97,6 +139,11 @@ class Envoy(LifecycleObject):
         self.route = None
         self.deployment = None
 
+    @property
+    def instance(self):
+        """Value of app.kubernetes.io/instance label of the Envoy pods"""
+        return self.name
+
     def create_route(self):
         """Creates routes pointing to this envoy"""
         tls = Route.Type.PASSTHROUGH if self.tls else None
@@ -109,15 +156,16 @@ class Envoy(LifecycleObject):
             "kind": "Service",
             "metadata": {"name": self.name, "namespace": self.openshift.project},
             "spec": {
-                "selector": {"app.kubernetes.io/instance": self.name},
+                "selector": {"app.kubernetes.io/instance": self.instance},
                 "ports": [
                     {"name": key, "targetPort": value, "port": value, "protocol": "TCP"}
                     for key, value in self.config.ports.items()
                 ],
             },
         }
-        return OpenShiftObject(dict_to_model=model)
+        return OpenShiftObject(dict_to_model=model, context=self.openshift.context)
 
+    @operation("commit envoy")
     def commit(self):
         self.deployment = EnvoyDeployment.create_instance(
             self.openshift,
@@ -129,16 +177,87 @@ class Envoy(LifecycleObject):
         )
         self.deployment.commit()
         self.deployment.wait()
+        self.trace_pods()
         self.service = self.create_service()
         self.service.commit()
         self.route = self.create_route()
         self.route.commit()
+        TRACER.add_route(self.route)
 
     def delete(self):
         for item in [self.route, self.service, self.deployment]:
             if item is not None:
                 item.delete()
 
+    def trace_pods(self):
+        """Adds startup phases of all Envoy pods to the trace"""
+        if TRACER.enabled:
+            with self.openshift.context:
+                TRACER.add_pods(self.pods().objects())
+
+    def pods(self):
+        """Returns selector for all the pods running this Envoy, requires to be run inside context"""
+        return oc.selector("pod", labels={"app.kubernetes.io/instance": self.instance})
+
+    @cached_property
+    def startup(self) -> dict[str, dict[str, float]]:
+        """Startup phases of every Envoy pod (see pods.startup_breakdown), taken at the time of the first access"""
+        with self.openshift.context:
+            return {pod.name(): startup_breakdown(pod, pod_events(pod)) for pod in self.pods().objects()}
+
+    def admin(self, pod_name: str, path: str, auto_raise=True):
+        """Calls Envoy admin interface on a specific pod, proxied through the OpenShift API"""
+        return self.openshift.do_action(
+            "get",
+            "--raw",
+            f"/api/v1/namespaces/{self.openshift.project}/pods/{pod_name}:{self.ADMIN_PORT}/proxy/{path}",
+            auto_raise=auto_raise,
+        )
+
+    def loaded_versions(self, pod_name: str) -> set[str]:
+        """Returns versions of the xDS resources loaded by Envoy in a specific pod, empty if not available"""
+        result = self.admin(pod_name, "config_dump", auto_raise=False)
+        if result.status() != 0:
+            return set()
+        return _xds_versions(json.loads(result.out()))
+
+    def stats(self, pattern: str = "") -> dict[str, int]:
+        """Returns Envoy counters and gauges matching the regex pattern, summed over all Envoy pods"""
+        with self.openshift.context:
+            pods = self.pods().objects()
+        totals: dict[str, int] = defaultdict(int)
+        for pod in pods:
+            result = self.admin(pod.name(), f"stats?format=json&filter={pattern}")
+            for stat in json.loads(result.out())["stats"]:
+                if "value" in stat:
+                    totals[stat["name"]] += stat["value"]
+        return totals
+
+    def is_loaded(self, pod_name: str, version: str):
+        """Returns True if Envoy in a specific pod loaded all resources in the expected version.
+        Marin3r versions secrets separately, so resource version only has to start with the expected version."""
+        versions = self.loaded_versions(pod_name)
+        return len(versions) > 0 and all(loaded.startswith(version) for loaded in versions)
+
+    @operation("wait_for_config")
+    def wait_for_config(self, version: str = None, timeout=60):
+        """
+        Waits until Envoy in every pod loaded resources of the expected version.
+        If version is not specified, the version currently published for the EnvoyConfig is used,
+        so after a change of the config, callers have to wait until the new version is published first.
+        """
+        if version is None:
+            version = self.config.published_version
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.openshift.context:
+                pods = self.pods().objects()
+            if pods and all(self.is_loaded(pod.name(), version) for pod in pods):
+                return True
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(self.POLL_PERIOD)
+
     def client(self, **kwargs):
         """Return Httpx client for the requests to this backend"""
         protocol = "https" if self.tls else "http"
@@ -148,22 +267,94 @@ class Envoy(LifecycleObject):
 class SidecarEnvoy(Envoy):
     """Envoy injected as a Sidecar"""
 
+    @property
+    def instance(self):
+        """Sidecar pods keep the label of the backend, so that changing Envoy doesn't roll out the backend"""
+        return self.backend.name
+
+    @operation("commit sidecarenvoy")
     def commit(self):
+        annotations = {
+            "marin3r.3scale.net/node-id": self.config.model.spec.nodeID,
+            "marin3r.3scale.net/envoy-image": self.image,
+            "marin3r.3scale.net/ports": ",".join(f"{key}:{value}" for key, value in self.config.ports.items()),
+        }
+        labels = {"marin3r.3scale.net/status": "enabled", "app.kubernetes.io/instance": self.instance}
+
         def _apply(deployment):
             template = deployment.model.spec.template
-            template.setdefault("metadata", {}).setdefault("annotations", {})[
-                "marin3r.3scale.net/node-id"
-            ] = self.config.name()
-            template.metadata.annotations["marin3r.3scale.net/envoy-image"] = self.image
-            template.metadata.annotations["marin3r.3scale.net/ports"] = ",".join(
-                f"{key}:{value}" for key, value in self.config.ports.items()
-            )
-            template.metadata.labels["marin3r.3scale.net/status"] = "enabled"
-            template.metadata.labels["app.kubernetes.io/instance"] = self.name
+            template.setdefault("metadata", {}).setdefault("annotations", {})
+            if all(template.metadata.annotations[key] == value for key, value in annotations.items()) and all(
+                template.metadata.labels[key] == value for key, value in labels.items()
+            ):
+                return False
+            template.metadata.annotations.update(annotations)
+            template.metadata.labels.update(labels)
+            return True
 
-        self.backend.deployment.modify_and_apply(_apply)
-        self.openshift.is_ready(self.backend.deployment.self_selector())
+        _, changed = self.backend.deployment.modify_and_apply(_apply)
+        if changed:
+            self.openshift.is_ready(self.backend.deployment.self_selector())
+        assert self.config.wait_published(None), "EnvoyConfig wasn't published in time"
+        assert self.wait_for_config(), "Sidecar Envoy didn't load the EnvoyConfig in time"
+        self.trace_pods()
         self.service = self.create_service()
         self.service.commit()
         self.route = self.create_route()
         self.route.commit()
+        TRACER.add_route(self.route)
+
+
+class SidecarPool:
+    """
+    Httpbin backends for Envoys injected as a sidecar. Each backend has a stable node-id (its name),
+    so EnvoyConfig created with that node-id is loaded by the already injected sidecar without restarting the pods.
+    Backend annotations, and therefore its pods, change only if the Envoy needs different ports or image.
+    If leases are given, backends are kept for the next runs (with their sidecars) instead of being deleted.
+    """
+
+    def __init__(self, openshift: OpenShiftClient, blame, label, leases: Optional[Leases] = None) -> None:
+        self.openshift = openshift
+        self.blame = blame
+        self.label = label
+        self.leases = leases
+        self.free: list[Httpbin] = []
+        self.backends: list[Httpbin] = []
+
+    @staticmethod
+    def node_id(backend: Httpbin) -> str:
+        """Returns node-id of the sidecar injected into the backend"""
+        return backend.name
+
+    def lease(self) -> Httpbin:
+        """Returns backend which is not used by any other Envoy, deploys new one if there is none"""
+        if not self.free:
+            backend = self._create() if self.leases is None else self._lease()
+            self.backends.append(backend)
+            return backend
+        return self.free.pop()
+
+    def _create(self) -> Httpbin:
+        backend = Httpbin(self.openshift, self.blame("httpbin"), self.label)
+        backend.commit()
+        return backend
+
+    def _lease(self) -> Httpbin:
+        """Returns backend of this worker with the same position in the pool, kept by one of the previous runs"""
+        data = self.leases.acquire(
+            f"sidecar-{len(self.backends)}-gw{worker_index()}",
+            lambda: self._create().export(),
+            lambda data: Httpbin.attach(self.openshift, data).healthy(),
+        )
+        return Httpbin.attach(self.openshift, data)
+
+    def release(self, backend: Httpbin):
+        """Returns backend to the pool, its sidecar keeps running"""
+        self.free.append(backend)
+
+    def delete(self):
+        """Deletes all backends in the pool, unless they are leased"""
+        for backend in self.backends if self.leases is None else []:
+            backend.delete()
+        self.backends.clear()
+        self.free.clear()
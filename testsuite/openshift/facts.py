@@ -0,0 +1,97 @@
+"""Cache for facts about the cluster (e.g. API URL or project), which don't change during the testrun"""
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from testsuite.utils import open_private, private_tempdir
+
+
+def testrun_path(testrun: str) -> str:
+    """Returns path to the file shared by all xdist workers of the testrun"""
+    return os.path.join(private_tempdir(), f"facts-{testrun}.json")
+
+
+def default_path() -> Optional[str]:
+    """Returns path to the file shared by all xdist workers of the same testrun, None outside xdist"""
+    if "MARIN3R_FACTS_CACHE" in os.environ:
+        return os.environ["MARIN3R_FACTS_CACHE"]
+    testrun = os.environ.get("PYTEST_XDIST_TESTRUNUID")
+    if testrun is None:
+        return None
+    return testrun_path(testrun)
+
+
+class FactsCache:
+    """
+    Cache with TTL, which remembers values in memory and in a file shared between processes.
+    Missing values (None) are never cached, so failed lookups are repeated. Private facts (e.g. secrets)
+    are never written to the file.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 600) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._facts: dict[str, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _shared(self):
+        """Locks the shared file and yields its content, changes to the content are written back"""
+        if self.path is None:
+            yield {}
+            return
+        with open_private(self.path) as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                try:
+                    facts = json.loads(file.read() or "{}")
+                except ValueError:
+                    facts = {}
+                original = dict(facts)
+                yield facts
+                if facts != original:
+                    file.seek(0)
+                    file.truncate()
+                    json.dump(facts, file)
+                    file.flush()
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def get(self, key: str, fetch: Callable[[], Any], private: bool = False) -> Any:
+        """Returns cached value, fetches and caches it, if it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            expires, value = self._facts.get(key, (0, None))
+            if expires > now:
+                return value
+            if private:
+                value = fetch()
+                if value is not None:
+                    self._facts[key] = (time.time() + self.ttl, value)
+                return value
+            with self._shared() as facts:
+                expires, value = facts.get(key, (0, None))
+                if expires <= now:
+                    value = fetch()
+                    if value is None:
+                        return None
+                    expires = time.time() + self.ttl
+                    facts[key] = (expires, value)
+                self._facts[key] = (expires, value)
+                return value
+
+    def invalidate(self, prefix: str = ""):
+        """Removes all facts with keys starting with prefix, all of them by default"""
+        with self._lock:
+            with self._shared() as facts:
+                for cache in (facts, self._facts):
+                    for key in [key for key in cache if key.startswith(prefix)]:
+                        del cache[key]
+
+
+FACTS = FactsCache(default_path(), float(os.environ.get("MARIN3R_FACTS_TTL", 600)))
@@ -2,13 +2,19 @@
 from functools import cached_property
 from importlib import resources
 
+import openshift as oc
+
 from testsuite.openshift import LifecycleObject
 from testsuite.openshift.client import OpenShiftClient
+from testsuite.perf.api import operation
 
 
 class Httpbin(LifecycleObject):
     """Httpbin deployed in OpenShift through template"""
 
+    TEMPLATE = resources.files("testsuite.resources").joinpath("httpbin.yaml")
+    HEALTH_TIMEOUT = 30
+
     def __init__(self, openshift: OpenShiftClient, name, label) -> None:
         super().__init__()
         self.openshift = openshift
@@ -17,20 +23,57 @@ class Httpbin(LifecycleObject):
 
         self.httpbin_objects = None
 
+    @classmethod
+    def attach(cls, openshift: OpenShiftClient, data: dict) -> "Httpbin":
+        """Returns Httpbin which was already deployed (e.g. by a different xdist worker), see export()"""
+        httpbin = cls(openshift, data["name"], data["label"])
+        with openshift.context:
+            httpbin.httpbin_objects = oc.selector(data["objects"])
+        return httpbin
+
+    def export(self) -> dict:
+        """Returns data needed to attach to this Httpbin"""
+        return {"name": self.name, "label": self.label, "objects": self.httpbin_objects.qnames()}
+
     @property
     def url(self):
         """URL for the httpbin service"""
         return f"{self.name}.{self.openshift.project}.svc.cluster.local"
 
+    @operation("commit httpbin")
     def commit(self):
-        self.httpbin_objects = self.openshift.new_app(
-            resources.files("testsuite.resources").joinpath("httpbin.yaml"),
-            {"NAME": self.name, "LABEL": self.label},
-        )
+        self.httpbin_objects = self.openshift.new_app(self.TEMPLATE, {"NAME": self.name, "LABEL": self.label})
 
         with self.openshift.context:
             assert self.openshift.is_ready(self.httpbin_objects.narrow("deployment")), "Httpbin wasn't ready in time"
 
+    @classmethod
+    @operation("commit httpbins")
+    def commit_all(cls, backends: list["Httpbin"]):
+        """Deploys multiple Httpbins in the same namespace at once and waits until all of them are ready"""
+        if not backends:
+            return
+        openshift = backends[0].openshift
+        selectors = openshift.new_apps(cls.TEMPLATE, [{"NAME": item.name, "LABEL": item.label} for item in backends])
+        for backend, selector in zip(backends, selectors):
+            backend.httpbin_objects = selector
+        with openshift.context:
+            deployments = oc.selector(
+                [qname for selector in selectors for qname in selector.narrow("deployment").qnames()]
+            )
+            assert openshift.is_ready(deployments), "Httpbins weren't ready in time"
+
+    def healthy(self) -> bool:
+        """Returns True if all objects of the Httpbin exist and its deployment is ready"""
+        with self.openshift.context:
+            if self.httpbin_objects.count_existing() != len(self.httpbin_objects.qnames()):
+                return False
+            try:
+                with oc.timeout(self.HEALTH_TIMEOUT):
+                    return self.openshift.is_ready(self.httpbin_objects.narrow("deployment"))
+            except oc.OpenShiftPythonException:
+                return False
+
     def delete(self):
         with self.openshift.context:
             if self.httpbin_objects:
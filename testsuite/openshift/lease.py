@@ -0,0 +1,93 @@
+"""Leases of session resources, which are kept running after the run and reused by the next runs"""
+import json
+import re
+import time
+from typing import Callable
+
+import openshift as oc
+
+from testsuite.openshift.client import OpenShiftClient
+from testsuite.perf.api import operation
+
+LEASE_LABEL = "marin3r-tests/lease"
+RESOURCE_LABEL = "marin3r-tests/resource"
+# Lease which wasn't used for this long is considered stale and its resources are created again
+TTL = 24 * 60 * 60
+
+
+def owner_label(owner: str) -> str:
+    """Returns owner in a form which is a valid label value"""
+    return re.sub(r"[^a-z0-9-]", "-", owner.lower())[:63].strip("-") or "unknown"
+
+
+class Leases:
+    """
+    Session resources leased by the owner in a namespace. Every lease is a ConfigMap with data needed to attach
+    to the resource (the same as for SharedResources), all leased objects are labelled by the owner,
+    so they can be released at once.
+    """
+
+    def __init__(self, openshift: OpenShiftClient, owner: str, ttl: float = TTL) -> None:
+        self.openshift = openshift
+        self.owner = owner_label(owner)
+        self.ttl = ttl
+
+    def _labels(self, resource: str) -> dict[str, str]:
+        return {LEASE_LABEL: self.owner, RESOURCE_LABEL: resource}
+
+    def _config_map(self, resource: str) -> str:
+        return f"lease-{self.owner}-{resource}"[:253]
+
+    def _store(self, resource: str, data: dict):
+        model = {
+            "apiVersion": "v1",
+            "kind": "ConfigMap",
+            "metadata": {"name": self._config_map(resource), "labels": self._labels(resource)},
+            "data": {"data": json.dumps(data), "expires": str(time.time() + self.ttl)},
+        }
+        with self.openshift.context:
+            oc.apply(model)
+
+    @operation("acquire lease")
+    def acquire(self, resource: str, create: Callable[[], dict], healthy: Callable[[dict], bool]) -> dict:
+        """
+        Returns data of the resource leased by a previous run, if it is still valid and healthy,
+        otherwise deletes its leftovers and creates it again. Data has to contain qualified names of all objects
+        of the resource in 'objects'.
+        """
+        with self.openshift.context:
+            lease = oc.selector(f"configmap/{self._config_map(resource)}").object(ignore_not_found=True)
+        if lease is not None:
+            data = json.loads(lease.model.data["data"])
+            if float(lease.model.data["expires"]) > time.time() and healthy(data):
+                self._store(resource, data)
+                return data
+            self.release(resource)
+
+        data = create()
+        with self.openshift.context:
+            oc.selector(data["objects"]).label(self._labels(resource))
+        self._store(resource, data)
+        return data
+
+    @operation("release lease")
+    def release(self, resource: str = None):
+        """Deletes objects of the leased resource together with the lease, all leases of the owner by default"""
+        labels = self._labels(resource) if resource else {LEASE_LABEL: self.owner}
+        with self.openshift.context:
+            oc.selector(["all", "configmap", "discoveryservice"], labels=labels).delete(ignore_not_found=True)
+
+
+def main():
+    """Releases all leases of the current tester in the configured namespace and in namespaces used for sharding"""
+    # pylint: disable=import-outside-toplevel
+    from testsuite.config import settings
+    from testsuite.utils import _whoami
+
+    client = settings["openshift"]
+    for namespace in dict.fromkeys([client.project, *settings.get("namespaces", [])]):
+        Leases(client.change_project(namespace), _whoami()).release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Helpers for inspecting state of the pods"""
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+import openshift as oc
+
+# Pod conditions in the order in which they are reached during pod startup
+CONDITIONS = [
+    ("scheduling", "PodScheduled"),
+    ("initialization", "Initialized"),
+    ("containers start", "ContainersReady"),
+    ("readiness", "Ready"),
+]
+
+# Messages of Pulled events, the first one when the image was pulled, the second one when it was already cached
+PULLED = re.compile(r'Successfully pulled image "(?P<image>[^"]+)" in (?P<duration>(?:[0-9.]+(?:h|ms|us|µs|ns|m|s))+)')
+PRESENT = re.compile(r'Container image "(?P<image>[^"]+)" already present on machine')
+DURATION = re.compile(r"([0-9.]+)(h|ms|us|µs|ns|m|s)")
+UNITS = {"h": 3600, "m": 60, "s": 1, "ms": 1e-3, "us": 1e-6, "µs": 1e-6, "ns": 1e-9}
+
+
+def timestamp(value: str) -> float:
+    """Converts Kubernetes timestamp to seconds since epoch"""
+    return datetime.fromisoformat(value).timestamp()
+
+
+def condition_phases(pod) -> list[tuple[str, float, float]]:
+    """Returns startup phases of the pod as (name, start, end) tuples, based on the pod conditions"""
+    model = pod.as_dict()
+    transitions = {
+        condition["type"]: timestamp(condition["lastTransitionTime"])
+        for condition in model.get("status", {}).get("conditions", [])
+        if condition.get("status") == "True" and condition.get("lastTransitionTime")
+    }
+    phases = []
+    previous = timestamp(model["metadata"]["creationTimestamp"])
+    for phase, condition in CONDITIONS:
+        if condition in transitions:
+            phases.append((phase, previous, transitions[condition]))
+            previous = transitions[condition]
+    return phases
+
+
+def go_duration(value: str) -> float:
+    """Converts duration formatted by Go (e.g. 1m2.5s) to seconds"""
+    return sum(float(number) * UNITS[unit] for number, unit in DURATION.findall(value))
+
+
+def image_pull(event: dict) -> Optional[tuple[str, float]]:
+    """Returns image and seconds it took to pull it from the Pulled event, None if it isn't one"""
+    message = event.get("message", "")
+    if match := PULLED.search(message):
+        return match.group("image"), go_duration(match.group("duration"))
+    if match := PRESENT.search(message):
+        return match.group("image"), 0.0
+    return None
+
+
+def pod_events(pod) -> list[dict]:
+    """Returns all events of the pod, requires to be run inside context"""
+    return [
+        event.as_dict() for event in oc.selector("event", field_selectors={"involvedObject.name": pod.name()}).objects()
+    ]
+
+
+def startup_breakdown(pod, events: list[dict]) -> dict[str, float]:
+    """
+    Returns durations (in seconds) of the pod startup phases: scheduling, init containers, image pulls,
+    start of every container (e.g. injected Envoy sidecar) and readiness after the last container started.
+    Phases which weren't reached yet are missing.
+    """
+    model = pod.as_dict()
+    status = model.get("status", {})
+    transitions = {
+        condition["type"]: timestamp(condition["lastTransitionTime"])
+        for condition in status.get("conditions", [])
+        if condition.get("status") == "True" and condition.get("lastTransitionTime")
+    }
+    started = {
+        container["name"]: timestamp(container["state"]["running"]["startedAt"])
+        for container in status.get("containerStatuses", [])
+        if "running" in container.get("state", {})
+    }
+    breakdown: dict[str, float] = defaultdict(float)
+    created = timestamp(model["metadata"]["creationTimestamp"])
+    if "PodScheduled" in transitions:
+        breakdown["scheduling"] = transitions["PodScheduled"] - created
+        if "Initialized" in transitions:
+            breakdown["initialization"] = transitions["Initialized"] - transitions["PodScheduled"]
+    for event in events:
+        if pull := image_pull(event):
+            breakdown["image_pull"] += pull[1]
+    if "Initialized" in transitions:
+        for name, start in started.items():
+            breakdown[f"container_start[{name}]"] = start - transitions["Initialized"]
+    if "Ready" in transitions and started:
+        breakdown["readiness"] = transitions["Ready"] - max(started.values())
+    return dict(breakdown)
@@ -0,0 +1,115 @@
+"""Warmup which pulls images on all schedulable nodes before tests deploy them"""
+import time
+
+import openshift as oc
+
+from testsuite.openshift import LifecycleObject, OpenShiftObject
+from testsuite.openshift.client import OpenShiftClient
+from testsuite.openshift.pods import image_pull
+from testsuite.perf.api import operation
+
+
+class ImagePrepull(LifecycleObject):
+    """
+    DaemonSet with an init container for every image, so that all nodes pull all the images.
+    Images don't have to contain any tools, init containers run a static busybox copied from the first one
+    and only a pause container keeps running afterwards.
+    """
+
+    POLL_PERIOD = 2
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self, openshift: OpenShiftClient, name, images: list[str], busybox_image, pause_image, timeout=600
+    ) -> None:
+        super().__init__()
+        self.openshift = openshift
+        self.name = name
+        self.images = list(dict.fromkeys(images))
+        self.busybox_image = busybox_image
+        self.pause_image = pause_image
+        self.timeout = timeout
+
+        self.daemon_set = None
+        self.times = None
+
+    def create_daemon_set(self):
+        """Creates DaemonSet which pulls all the images"""
+        model = {
+            "apiVersion": "apps/v1",
+            "kind": "DaemonSet",
+            "metadata": {"name": self.name, "namespace": self.openshift.project},
+            "spec": {
+                "selector": {"matchLabels": {"app": self.name}},
+                "template": {
+                    "metadata": {"labels": {"app": self.name}},
+                    "spec": {
+                        "terminationGracePeriodSeconds": 0,
+                        "volumes": [{"name": "tools", "emptyDir": {}}],
+                        "initContainers": [
+                            {
+                                "name": "tools",
+                                "image": self.busybox_image,
+                                "command": ["cp", "/bin/busybox", "/tools/busybox"],
+                                "volumeMounts": [{"name": "tools", "mountPath": "/tools"}],
+                            },
+                            *(
+                                {
+                                    "name": f"image-{index}",
+                                    "image": image,
+                                    "imagePullPolicy": "IfNotPresent",
+                                    "command": ["/tools/busybox", "true"],
+                                    "volumeMounts": [{"name": "tools", "mountPath": "/tools"}],
+                                }
+                                for index, image in enumerate(self.images)
+                            ),
+                        ],
+                        "containers": [{"name": "pause", "image": self.pause_image}],
+                    },
+                },
+            },
+        }
+        return OpenShiftObject(dict_to_model=model, context=self.openshift.context)
+
+    @operation("commit prepull")
+    def commit(self):
+        self.daemon_set = self.create_daemon_set()
+        self.daemon_set.commit()
+        self.times = self.wait()
+        assert self.times is not None, f"Images weren't pulled on all nodes in {self.timeout}s"
+
+    def pull_times(self) -> dict[str, dict[str, float]]:
+        """
+        Returns seconds it took to pull every image on every node, images which were already present took 0.
+        If there are more events for the same image (e.g. recreated pod), the actual pull is the longest one.
+        """
+        with self.openshift.context:
+            pods = oc.selector("pod", labels={"app": self.name}).objects()
+            events = oc.selector("event", field_selectors={"reason": "Pulled"}).objects()
+        nodes = {pod.name(): pod.model.spec.nodeName for pod in pods if pod.model.spec.nodeName}
+        times: dict[str, dict[str, float]] = {node: {} for node in nodes.values()}
+        for event in events:
+            model = event.as_dict()
+            pod = model.get("involvedObject", {}).get("name")
+            pull = image_pull(model)
+            if pod in nodes and pull is not None and pull[0] in self.images:
+                times[nodes[pod]][pull[0]] = max(times[nodes[pod]].get(pull[0], 0.0), pull[1])
+        return times
+
+    @operation("wait_prepull")
+    def wait(self):
+        """Waits until all images were pulled on all nodes, returns pull times (see pull_times) or None on timeout"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            desired = self.daemon_set.refresh().model.status.desiredNumberScheduled
+            times = self.pull_times()
+            if desired and len(times) == desired and all(len(images) == len(self.images) for images in times.values()):
+                return times
+            if time.monotonic() > deadline:
+                return None
+            time.sleep(self.POLL_PERIOD)
+
+    def delete(self):
+        if self.daemon_set is not None:
+            self.daemon_set.delete(ignore_not_found=True)
+        self.daemon_set = None
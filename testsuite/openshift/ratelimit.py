@@ -0,0 +1,153 @@
+"""Client-side rate limiting of oc invocations with priorities"""
+import enum
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+import pytest
+from openshift import Context
+
+from testsuite.perf.api import API_RECORDER
+
+
+class Priority(enum.IntEnum):
+    """Priority of the oc invocation, lower value is served first"""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+# Priority of the innermost operation is decided by the prefix of its name
+PRIORITIES = {
+    "commit": Priority.HIGH,
+    "create": Priority.HIGH,
+    "new_app": Priority.HIGH,
+    "new_project": Priority.HIGH,
+    "delete": Priority.LOW,
+    "wait": Priority.LOW,
+    "is_ready": Priority.LOW,
+}
+
+
+def current_priority() -> Priority:
+    """Returns priority of the operation currently running in this thread"""
+    name = API_RECORDER.current or ""
+    for prefix, priority in PRIORITIES.items():
+        if name.startswith(prefix):
+            return priority
+    return Priority.NORMAL
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all threads of the process. Waiting invocations get tokens ordered by their priority
+    (and in FIFO order within the same priority). Does nothing unless rate is configured.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.delays: dict[str, list[float]] = defaultdict(list)
+        self._waiting: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def configure(self, rate: Optional[float], burst: int = 1):
+        """Changes the rate (tokens per second) and the size of the bucket, None rate disables limiting"""
+        if rate is not None and rate <= 0:
+            raise ValueError(f"Rate limit has to be positive, got {rate}")
+        with self._condition:
+            self.rate = rate
+            self.burst = max(burst, 1)
+            self.tokens = float(self.burst)
+            self.updated = time.monotonic()
+            self._condition.notify_all()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority: Priority = Priority.NORMAL):
+        """Blocks until a token is available for this invocation"""
+        if self.rate is None:
+            return
+        start = time.monotonic()
+        with self._condition:
+            ticket = (int(priority), next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                if self.rate is None:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    break
+                self._refill()
+                if self._waiting[0] == ticket and self.tokens >= 1:
+                    heapq.heappop(self._waiting)
+                    self.tokens -= 1
+                    break
+                self._condition.wait((1 - self.tokens) / self.rate if self.tokens < 1 else None)
+            self._condition.notify_all()
+        self.delays[priority.name].append(time.monotonic() - start)
+
+
+RATE_LIMITER = RateLimiter()
+
+_local = threading.local()
+
+
+class LimitedContext(Context):
+    """Context, which takes a token from the rate limiter before every oc invocation"""
+
+    def __init__(self, limiter: RateLimiter = RATE_LIMITER) -> None:
+        super().__init__()
+        self.limiter = limiter
+
+    def get_oc_path(self):
+        # oc path is also resolved through parent contexts, token is taken only once per invocation
+        if getattr(_local, "resolving", False):
+            return super().get_oc_path()
+        self.limiter.acquire(current_priority())
+        _local.resolving = True
+        try:
+            return super().get_oc_path()
+        finally:
+            _local.resolving = False
+
+
+class RateLimiterPlugin:
+    """Pytest plugin, which reports time oc invocations spent waiting in the rate limiter"""
+
+    def __init__(self, limiter: RateLimiter) -> None:
+        self.limiter = limiter
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):  # pylint: disable=unused-argument
+        """Collects delays from xdist workers"""
+        for priority, delays in getattr(node, "workeroutput", {}).get("rate_limiter", {}).items():
+            self.limiter.delays[priority].extend(delays)
+
+    def pytest_sessionfinish(self, session):
+        """Exports delays to xdist controller"""
+        if hasattr(session.config, "workeroutput"):
+            session.config.workeroutput["rate_limiter"] = dict(self.limiter.delays)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Prints queueing delay per priority"""
+        if not self.limiter.delays:
+            return
+        terminalreporter.write_sep("=", "OpenShift API rate limiting")
+        terminalreporter.write_line(f"{'priority':10} {'calls':>6} {'delayed':>7} {'total[s]':>9} {'max[s]':>7}")
+        for priority in Priority:
+            delays = self.limiter.delays.get(priority.name, [])
+            if delays:
+                terminalreporter.write_line(
+                    f"{priority.name:10} {len(delays):6} {sum(1 for x in delays if x > 0.001):7}"
+                    f" {sum(delays):9.2f} {max(delays):7.2f}"
+                )
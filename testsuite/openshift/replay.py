@@ -0,0 +1,10 @@
+"""Context which replays OpenShift API interactions recorded in a cassette"""
+from testsuite.openshift.ratelimit import LimitedContext
+from testsuite.perf.cassette import CASSETTE
+
+
+class ReplayContext(LimitedContext):
+    """Context which serves all oc invocations from the cassette, openshift-client sends them to its ssh client"""
+
+    def get_ssh_client(self):
+        return CASSETTE
@@ -0,0 +1,66 @@
+"""Resources provisioned once and shared by all xdist workers of the same testrun"""
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from testsuite.utils import open_private, private_tempdir
+
+
+def testrun_path(testrun: str) -> str:
+    """Returns path to the state file shared by all xdist workers of the testrun"""
+    return os.path.join(private_tempdir(), f"shared-{testrun}.json")
+
+
+def default_path() -> Optional[str]:
+    """Returns path to the state file shared by all xdist workers of the same testrun, None outside xdist"""
+    testrun = os.environ.get("PYTEST_XDIST_TESTRUNUID")
+    if testrun is None:
+        return None
+    return testrun_path(testrun)
+
+
+class SharedResources:
+    """
+    Registry of shared resources, kept in a file locked by the worker which works with it.
+    First worker which acquires the resource provisions it and publishes data needed to attach to it,
+    others only attach. Last worker which releases the resource deletes it.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    @contextmanager
+    def _locked(self):
+        """Locks the state file and yields its content, changes to the content are written back"""
+        with open_private(self.path) as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                state = json.loads(file.read() or "{}")
+                yield state
+                file.seek(0)
+                file.truncate()
+                json.dump(state, file)
+                file.flush()
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def acquire(self, name: str, create: Callable[[], dict]) -> dict:
+        """Returns data of the shared resource, creates it (while other workers wait) if it doesn't exist yet"""
+        with self._locked() as state:
+            if name not in state:
+                state[name] = {"data": create(), "references": 0}
+            state[name]["references"] += 1
+            return state[name]["data"]
+
+    def release(self, name: str, delete: Callable[[dict], None]):
+        """Releases the shared resource, it is deleted if no other worker uses it"""
+        with self._locked() as state:
+            if name not in state:
+                return
+            state[name]["references"] -= 1
+            if state[name]["references"] <= 0:
+                data = state.pop(name)["data"]
+                delete(data)
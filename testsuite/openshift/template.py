@@ -0,0 +1,83 @@
+"""Local rendering of OpenShift templates, replaces `oc process --local` without spawning any process"""
+import re
+from functools import lru_cache
+from typing import Any, Dict
+
+import yaml
+
+# ${NAME} is substituted inside strings, ${{NAME}} replaces the whole value with the parameter parsed as YAML
+PARAMETER = re.compile(r"\$\{(\w+)\}")
+NON_STRING_PARAMETER = re.compile(r"^\$\{\{(\w+)\}\}$")
+
+
+class TemplateError(ValueError):
+    """Template can't be rendered with the given parameters"""
+
+
+class Template:
+    """Parsed OpenShift template"""
+
+    def __init__(self, model: dict) -> None:
+        self.name = model.get("metadata", {}).get("name")
+        self.objects = model.get("objects", [])
+        self.parameters = {parameter["name"]: parameter for parameter in model.get("parameters", [])}
+
+    @property
+    def images(self) -> list[str]:
+        """Returns images of all containers in the objects of the template"""
+        return [
+            container["image"]
+            for obj in self.objects
+            for key in ("initContainers", "containers")
+            for container in obj.get("spec", {}).get("template", {}).get("spec", {}).get(key, [])
+        ]
+
+    def values(self, params: Dict[str, str]) -> Dict[str, str]:
+        """Returns values of all parameters, the same way `oc process` would resolve them"""
+        unknown = params.keys() - self.parameters.keys()
+        if unknown:
+            raise TemplateError(f"Unknown parameters for template {self.name}: {', '.join(sorted(unknown))}")
+        values = {}
+        for name, parameter in self.parameters.items():
+            if name in params:
+                values[name] = str(params[name])
+            elif "value" in parameter:
+                values[name] = str(parameter["value"])
+            elif parameter.get("required", False) or "generate" in parameter:
+                raise TemplateError(f"Parameter {name} of template {self.name} is required")
+            else:
+                values[name] = ""
+        return values
+
+    def _substitute(self, value: Any, values: Dict[str, str]) -> Any:
+        if isinstance(value, dict):
+            return {self._substitute(key, values): self._substitute(item, values) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._substitute(item, values) for item in value]
+        if isinstance(value, str):
+            match = NON_STRING_PARAMETER.match(value)
+            if match and match.group(1) in values:
+                return yaml.safe_load(values[match.group(1)])
+            return PARAMETER.sub(lambda match: values.get(match.group(1), match.group(0)), value)
+        return value
+
+    def render(self, params: Dict[str, str] = None) -> list[dict]:
+        """Returns all objects of the template with substituted parameters"""
+        values = self.values(params or {})
+        return [self._substitute(obj, values) for obj in self.objects]
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> Template:
+    with open(path, encoding="utf-8") as file:
+        return Template(yaml.safe_load(file))
+
+
+def load(path) -> Template:
+    """Returns template from the local file, every file is parsed only once"""
+    return _load(str(path))
+
+
+def render(path, params: Dict[str, str] = None) -> list[dict]:
+    """Returns objects of the template in the local file with substituted parameters"""
+    return load(path).render(params)
@@ -0,0 +1,133 @@
+"""Local validation of EnvoyConfig resources, which catches invalid configs before they are sent to the webhook"""
+import hashlib
+import json
+import re
+from typing import Any, Iterator
+
+import yaml
+
+# Envoy v3 removed v2 and older alpha APIs, other types (e.g. xds.type.v3.TypedStruct, udpa.type.v1.TypedStruct)
+# are left to the webhook
+REMOVED_TYPE = re.compile(r"^envoy\..*\.v[12](alpha\d*)?\.")
+
+# Fields required by Envoy v3 API for each resource type
+REQUIRED_FIELDS = {
+    "listener": ("name", "address"),
+    "cluster": ("name",),
+    "route": ("name",),
+    "scopedRoute": ("name", "route_configuration_name", "key"),
+    "endpoint": ("cluster_name",),
+    "runtime": ("name",),
+}
+
+# Resource types of legacy envoyResources field
+LEGACY_TYPES = {
+    "listeners": "listener",
+    "clusters": "cluster",
+    "routes": "route",
+    "scopedRoutes": "scopedRoute",
+    "endpoints": "endpoint",
+    "runtimes": "runtime",
+}
+
+_CACHE: dict[str, tuple[str, ...]] = {}
+
+
+class InvalidConfig(Exception):
+    """EnvoyConfig contains resources which would be rejected"""
+
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__("Invalid EnvoyConfig:\n" + "\n".join(errors))
+        self.errors = errors
+
+
+def _typed_configs(value: Any, path: str) -> Iterator[tuple[str, Any]]:
+    """Yields all typed_config sections in the resource together with their path"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "typed_config":
+                yield f"{path}.{key}", item
+            yield from _typed_configs(item, f"{path}.{key}")
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _typed_configs(item, f"{path}[{index}]")
+
+
+def _check_address(address: Any, path: str) -> list[str]:
+    if not isinstance(address, dict):
+        return [f"{path}: must be an Address object, got {address!r}"]
+    if "socket_address" in address:
+        socket_address = address["socket_address"]
+        if not isinstance(socket_address, dict) or "address" not in socket_address:
+            return [f"{path}.socket_address: address is required"]
+        if not isinstance(socket_address.get("port_value", 0), int):
+            return [f"{path}.socket_address.port_value: must be an integer"]
+        return []
+    if not {"pipe", "envoy_internal_address"} & address.keys():
+        return [f"{path}: one of socket_address, pipe or envoy_internal_address is required"]
+    return []
+
+
+def _check(kind: str, value: Any) -> list[str]:
+    path = f"{kind}/{value.get('name', '?')}" if isinstance(value, dict) else kind
+    if not isinstance(value, dict):
+        return [f"{path}: must be an object, got {value!r}"]
+    errors = [f"{path}: {field} is required" for field in REQUIRED_FIELDS.get(kind, ()) if field not in value]
+    for typed_path, typed_config in _typed_configs(value, path):
+        type_url = typed_config.get("@type", "") if isinstance(typed_config, dict) else ""
+        if not type_url:
+            errors.append(f"{typed_path}: @type is required")
+        elif REMOVED_TYPE.match(type_url.rsplit("/", 1)[-1]):
+            errors.append(f"{typed_path}: @type must not use v2 or alpha Envoy API, got {type_url!r}")
+    if kind == "listener":
+        if "address" in value:
+            errors.extend(_check_address(value["address"], f"{path}.address"))
+        for index, chain in enumerate(value.get("filter_chains", [])):
+            for filter_index, item in enumerate(chain.get("filters", []) if isinstance(chain, dict) else [None]):
+                if not isinstance(item, dict) or "name" not in item:
+                    errors.append(f"{path}.filter_chains[{index}].filters[{filter_index}]: name is required")
+    if kind == "route":
+        for index, host in enumerate(value.get("virtual_hosts", [])):
+            if not isinstance(host, dict) or not {"name", "domains"} <= host.keys():
+                errors.append(f"{path}.virtual_hosts[{index}]: name and domains are required")
+    return errors
+
+
+def validate_resource(kind: str, value: Any) -> tuple[str, ...]:
+    """Returns errors found in a single resource, results are cached by the content of the resource"""
+    if isinstance(value, str):
+        try:
+            value = yaml.safe_load(value)
+        except yaml.YAMLError as error:
+            return (f"{kind}: invalid YAML: {error}",)
+    digest = hashlib.sha256(json.dumps([kind, value], sort_keys=True, default=str).encode()).hexdigest()
+    if digest not in _CACHE:
+        _CACHE[digest] = tuple(_check(kind, value))
+    return _CACHE[digest]
+
+
+def resources(model: dict) -> Iterator[tuple[str, Any]]:
+    """Yields type and value of all resources in the EnvoyConfig model"""
+    spec = model.get("spec", {})
+    for field, kind in LEGACY_TYPES.items():
+        for resource in spec.get("envoyResources", {}).get(field, []):
+            yield kind, resource.get("value")
+    for secret in spec.get("envoyResources", {}).get("secrets", []):
+        yield "secret", secret.get("name")
+    for resource in spec.get("resources", []):
+        if resource.get("type") == "secret":
+            yield "secret", resource.get("generateFromTlsSecret")
+        else:
+            yield resource.get("type"), resource.get("value")
+
+
+def validate(model: dict) -> list[str]:
+    """Returns all errors found in the EnvoyConfig model, empty if it is valid"""
+    errors = []
+    for kind, value in resources(model):
+        if kind == "secret":
+            if not value or not isinstance(value, str):
+                errors.append(f"secret: name of the TLS secret is required, got {value!r}")
+        else:
+            errors.extend(validate_resource(kind, value))
+    return errors
@@ -0,0 +1 @@
+"""Instrumentation and measurements of the testsuite performance"""
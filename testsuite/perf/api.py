@@ -0,0 +1,286 @@
+"""Low-overhead instrumentation of all OpenShift API calls, which are made through oc"""
+import dataclasses
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Optional
+
+import pytest
+
+
+@dataclasses.dataclass
+class ApiCall:
+    """Single oc invocation"""
+
+    verb: str
+    kind: str
+    name: str
+    duration: float
+    bytes_in: int
+    bytes_out: int
+    success: bool
+    retry: bool
+    operation: Optional[str] = None
+    test: Optional[str] = None
+    fixture: Optional[str] = None
+
+
+@dataclasses.dataclass
+class Operation:
+    """Testsuite operation (e.g. commit or wait), which can consist of multiple oc invocations"""
+
+    name: str
+    duration: float
+    calls: int
+    retries: int
+    test: Optional[str] = None
+    fixture: Optional[str] = None
+    start: float = 0
+    thread: str = ""
+    worker: str = ""
+
+
+@dataclasses.dataclass
+class _Frame:
+    """Operation which is currently in progress"""
+
+    name: str
+    calls: int = 0
+    retries: int = 0
+    seen: set = dataclasses.field(default_factory=set)
+
+
+def describe(action) -> tuple[str, str]:
+    """Returns kind and name of the resource that the oc action worked with"""
+    args = action.cmd[2:]
+    if "--raw" in args:
+        return "raw", args[args.index("--raw") + 1].rsplit("/", 1)[-1]
+    for arg in args:
+        if not arg.startswith("-"):
+            kind, _, name = arg.partition("/")
+            return kind, name
+    if action.stdin_str:
+        try:
+            model = json.loads(action.stdin_str)
+        except ValueError:
+            return "", ""
+        if model.get("kind") == "List":
+            return "List", ",".join(sorted({item.get("kind", "") for item in model.get("items", [])}))
+        return model.get("kind", ""), model.get("metadata", {}).get("name", "")
+    return "", ""
+
+
+class ApiRecorder:
+    """
+    Records all oc invocations, it is used as a tracking strategy of openshift-client contexts.
+    Calls are attributed to the innermost operation and to the test and fixture which are currently running.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[ApiCall] = []
+        self.operations: list[Operation] = []
+        self.test: Optional[str] = None
+        self.fixture: Optional[str] = None
+        self.worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        self._local = threading.local()
+
+    @property
+    def _stack(self) -> list[_Frame]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @property
+    def current(self) -> Optional[str]:
+        """Returns name of the innermost operation running in this thread"""
+        return self._stack[-1].name if self._stack else None
+
+    def __call__(self, action):
+        kind, name = describe(action)
+        frame = self._stack[-1] if self._stack else None
+        retry = False
+        if frame is not None:
+            key = (action.verb, kind, name)
+            retry = key in frame.seen
+            frame.seen.add(key)
+            frame.calls += 1
+            frame.retries += retry
+        self.calls.append(
+            ApiCall(
+                verb=action.verb,
+                kind=kind,
+                name=name,
+                duration=max(action.elapsed_time, 0),
+                bytes_in=len(action.stdin_str or ""),
+                bytes_out=len(action.out) + len(action.err),
+                success=action.status == 0,
+                retry=retry,
+                operation=frame.name if frame else None,
+                test=self.test,
+                fixture=self.fixture,
+            )
+        )
+
+    @contextmanager
+    def operation(self, name: str):
+        """Groups all oc invocations made inside into a single operation"""
+        frame = _Frame(name)
+        self._stack.append(frame)
+        start = time.time()
+        counter = time.perf_counter()
+        try:
+            yield frame
+        finally:
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1].calls += frame.calls
+                self._stack[-1].retries += frame.retries
+            self.operations.append(
+                Operation(
+                    name,
+                    time.perf_counter() - counter,
+                    frame.calls,
+                    frame.retries,
+                    self.test,
+                    self.fixture,
+                    start,
+                    threading.current_thread().name,
+                    self.worker,
+                )
+            )
+
+    def export(self) -> dict:
+        """Returns all recorded data in a serializable form"""
+        return {
+            "calls": [dataclasses.asdict(call) for call in self.calls],
+            "operations": [dataclasses.asdict(operation) for operation in self.operations],
+        }
+
+    def merge(self, data: dict):
+        """Merges data exported by a different recorder, e.g. from xdist worker"""
+        self.calls.extend(ApiCall(**call) for call in data.get("calls", []))
+        self.operations.extend(Operation(**operation) for operation in data.get("operations", []))
+
+    def summary(self) -> dict:
+        """Returns aggregated statistics per verb and kind, operation, test and fixture"""
+        by_verb: dict = defaultdict(lambda: defaultdict(float))
+        by_test: dict = defaultdict(lambda: defaultdict(float))
+        by_fixture: dict = defaultdict(lambda: defaultdict(float))
+        for call in self.calls:
+            stats = by_verb[f"{call.verb} {call.kind}".strip()]
+            stats["calls"] += 1
+            stats["retries"] += call.retry
+            stats["failures"] += not call.success
+            stats["duration"] += call.duration
+            stats["max"] = max(stats["max"], call.duration)
+            stats["bytes_in"] += call.bytes_in
+            stats["bytes_out"] += call.bytes_out
+            for key, group in ((call.test, by_test), (call.fixture, by_fixture)):
+                if key is not None:
+                    group[key]["calls"] += 1
+                    group[key]["duration"] += call.duration
+
+        by_operation: dict = defaultdict(lambda: defaultdict(float))
+        for operation in self.operations:
+            stats = by_operation[operation.name]
+            stats["count"] += 1
+            stats["calls"] += operation.calls
+            stats["retries"] += operation.retries
+            stats["duration"] += operation.duration
+            stats["max"] = max(stats["max"], operation.duration)
+
+        return {
+            "by_verb": by_verb,
+            "by_operation": by_operation,
+            "by_test": by_test,
+            "by_fixture": by_fixture,
+        }
+
+
+API_RECORDER = ApiRecorder()
+
+
+def operation(name: str):
+    """Decorator which records the decorated function as a single operation"""
+
+    def _decorator(func):
+        @functools.wraps(func)
+        def _wrapper(*args, **kwargs):
+            with API_RECORDER.operation(name):
+                return func(*args, **kwargs)
+
+        return _wrapper
+
+    return _decorator
+
+
+class ApiMetricsPlugin:
+    """Pytest plugin, which attributes API calls to tests and fixtures and reports them at the end of the session"""
+
+    def __init__(self, recorder: ApiRecorder, path: Optional[str] = None) -> None:
+        self.recorder = recorder
+        self.path = path
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        """Attributes calls to the running test"""
+        self.recorder.test = item.nodeid
+        yield
+        self.recorder.test = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef):
+        """Attributes calls to the fixture which is being set up"""
+        previous = self.recorder.fixture
+        self.recorder.fixture = fixturedef.argname
+        yield
+        self.recorder.fixture = previous
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):  # pylint: disable=unused-argument
+        """Collects calls recorded by xdist workers"""
+        self.recorder.merge(getattr(node, "workeroutput", {}).get("api_metrics", {}))
+
+    def pytest_sessionfinish(self, session):
+        """Exports calls to xdist controller or to a file"""
+        if hasattr(session.config, "workeroutput"):
+            session.config.workeroutput["api_metrics"] = self.recorder.export()
+        elif self.path:
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump({**self.recorder.summary(), **self.recorder.export()}, file, indent=2)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Prints summary table of all API calls"""
+        if not self.recorder.calls:
+            return
+        summary = self.recorder.summary()
+        terminalreporter.write_sep("=", "OpenShift API calls")
+        terminalreporter.write_line(
+            f"{'verb kind':40} {'calls':>6} {'retries':>7} {'failed':>6} {'total[s]':>9} {'max[s]':>7}"
+            f" {'in[kB]':>8} {'out[kB]':>8}"
+        )
+        for key, stats in sorted(summary["by_verb"].items(), key=lambda x: -x[1]["duration"]):
+            terminalreporter.write_line(
+                f"{key:40} {stats['calls']:6.0f} {stats['retries']:7.0f} {stats['failures']:6.0f}"
+                f" {stats['duration']:9.2f} {stats['max']:7.2f}"
+                f" {stats['bytes_in'] / 1024:8.1f} {stats['bytes_out'] / 1024:8.1f}"
+            )
+        terminalreporter.write_line("")
+        terminalreporter.write_line(f"{'operation':40} {'count':>6} {'calls':>6} {'retries':>7} {'total[s]':>9}")
+        for key, stats in sorted(summary["by_operation"].items(), key=lambda x: -x[1]["duration"]):
+            terminalreporter.write_line(
+                f"{key:40} {stats['count']:6.0f} {stats['calls']:6.0f} {stats['retries']:7.0f}"
+                f" {stats['duration']:9.2f}"
+            )
+        terminalreporter.write_line("")
+        terminalreporter.write_line(f"{'fixture':40} {'calls':>6} {'total[s]':>9}")
+        for key, stats in sorted(summary["by_fixture"].items(), key=lambda x: -x[1]["duration"]):
+            terminalreporter.write_line(f"{key:40} {stats['calls']:6.0f} {stats['duration']:9.2f}")
+        terminalreporter.write_line("")
+        terminalreporter.write_line(f"{'slowest tests':80} {'calls':>6} {'total[s]':>9}")
+        for key, stats in sorted(summary["by_test"].items(), key=lambda x: -x[1]["duration"])[:10]:
+            terminalreporter.write_line(f"{key:80} {stats['calls']:6.0f} {stats['duration']:9.2f}")
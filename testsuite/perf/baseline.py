@@ -0,0 +1,210 @@
+"""Store of performance metrics of past runs and a gate which detects regressions against them"""
+import dataclasses
+import json
+import os
+import re
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from statistics import NormalDist
+from typing import Optional
+
+import pytest
+
+from testsuite.perf.api import ApiRecorder
+
+# Regression has to be both statistically significant (one-sided p-value) and large enough to matter
+ALPHA = 0.01
+MIN_CHANGE = 0.1
+# Durations of cached fixtures are close to 0, small absolute changes of durations are noise
+MIN_SECONDS = 0.5
+# Smallest absolute change of other metrics (counts, rates) which can be a regression
+MIN_DIFFERENCE = 1.0
+MIN_SAMPLES = 3
+HISTORY = 10
+# Durations, including per-fixture ones, e.g. setup_seconds[envoy]
+DURATION = re.compile(r"_seconds(\[.*\])?$")
+# Phase durations include module scoped fixtures, which are set up by whichever test of the module runs first
+PHASE = re.compile(r"^(setup|teardown)_seconds(\[.*\])?$")
+
+
+def git_commit() -> str:
+    """Returns commit of the testsuite, 'unknown' outside of git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def higher_is_better(metric: str) -> bool:
+    """Returns True if the metric improves when it grows, e.g. throughput"""
+    return metric.endswith("_per_second")
+
+
+@dataclasses.dataclass
+class Regression:
+    """Metric of a test which is significantly worse than in the baseline"""
+
+    test: str
+    metric: str
+    value: float
+    mean: float
+    stdev: float
+    p_value: float
+
+    @property
+    def change(self) -> float:
+        """Relative change against the baseline mean"""
+        return (self.value - self.mean) / self.mean if self.mean else float("inf")
+
+
+def module_metrics(metrics: dict[str, dict[str, float]], failed: set[str]) -> dict[str, dict[str, float]]:
+    """Moves setup and teardown durations of tests to their modules (summed), modules with failed tests are left out"""
+    result: dict[str, dict[str, float]] = defaultdict(dict)
+    failed_modules = {test.split("::")[0] for test in failed}
+    for test, values in metrics.items():
+        module = test.split("::")[0]
+        for metric, value in values.items():
+            if not PHASE.search(metric):
+                result[test][metric] = value
+            elif module not in failed_modules:
+                result[module][metric] = result[module].get(metric, 0.0) + value
+    return dict(result)
+
+
+def compare(metric: str, value: float, history: list[float]) -> Optional[float]:
+    """Returns one-sided p-value of the value being a regression against the history, None if it isn't one"""
+    if len(history) < MIN_SAMPLES:
+        return None
+    if not any(history):
+        # Metric which was always 0 (e.g. image pull served from cache) has no baseline to compare with
+        return None
+    mean, stdev = statistics.fmean(history), statistics.stdev(history)
+    worse = value > mean if not higher_is_better(metric) else value < mean
+    if not worse or (mean and abs(value - mean) / abs(mean) < MIN_CHANGE):
+        return None
+    floor = MIN_SECONDS if DURATION.search(metric) else MIN_DIFFERENCE
+    if abs(value - mean) < floor:
+        return None
+    # Variability of a few samples can't be estimated below the floor
+    stdev = max(stdev, floor)
+    cdf = NormalDist(mean, stdev).cdf(value)
+    p_value = cdf if higher_is_better(metric) else 1 - cdf
+    return p_value if p_value < ALPHA else None
+
+
+class BaselineStore:
+    """Append-only JSON lines file, every line contains all metrics of a single run together with its versions"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def runs(self) -> list[dict]:
+        """Returns all stored runs, oldest first"""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def append(self, run: dict):
+        """Stores a new run"""
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(run, sort_keys=True) + "\n")
+
+    def history(self, limit: int = HISTORY) -> dict[str, dict[str, list[float]]]:
+        """Returns values of every metric of every test from the last runs, values which regressed are left out"""
+        history: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+        for run in self.runs()[-limit:]:
+            regressed = run.get("regressions", {})
+            for test, metrics in run["metrics"].items():
+                for metric, value in metrics.items():
+                    if metric not in regressed.get(test, []):
+                        history[test][metric].append(value)
+        return history
+
+    def regressions(self, metrics: dict[str, dict[str, float]], limit: int = HISTORY) -> list[Regression]:
+        """Returns all metrics which are significantly worse than in the last runs"""
+        history = self.history(limit)
+        regressions = []
+        for test, values in metrics.items():
+            for metric, value in values.items():
+                past = history.get(test, {}).get(metric, [])
+                p_value = compare(metric, value, past)
+                if p_value is not None:
+                    regressions.append(
+                        Regression(test, metric, value, statistics.fmean(past), statistics.stdev(past), p_value)
+                    )
+        return regressions
+
+
+class BaselinePlugin:
+    """
+    Pytest plugin, which collects durations, API calls and numeric properties of all passed tests,
+    compares them with the baseline and stores them as a new run. Setup and teardown durations are stored per module.
+    Runs only in xdist controller.
+    """
+
+    def __init__(self, store: BaselineStore, recorder: ApiRecorder, versions: dict, gate: bool) -> None:
+        self.store = store
+        self.recorder = recorder
+        self.versions = versions
+        self.gate = gate
+        self.metrics: dict[str, dict[str, float]] = defaultdict(dict)
+        self.failed: set[str] = set()
+        self.skipped: set[str] = set()
+        self.regressions: list[Regression] = []
+
+    def pytest_runtest_logreport(self, report):
+        """Collects durations and numeric properties of the test"""
+        if report.failed:
+            self.failed.add(report.nodeid)
+            return
+        if report.skipped:
+            # Skipped tests have no metrics, but they don't invalidate their module
+            self.skipped.add(report.nodeid)
+            return
+        self.metrics[report.nodeid][f"{report.when}_seconds"] = report.duration
+        # Teardown report contains all properties, including those added after the call
+        if report.when == "teardown":
+            for name, value in report.user_properties:
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self.metrics[report.nodeid][name] = value
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        """Compares the run with the baseline and stores it, fails the session on regression if gate is enabled"""
+        for test, stats in self.recorder.summary()["by_test"].items():
+            if test in self.metrics:
+                self.metrics[test]["api_calls"] = stats["calls"]
+        metrics = module_metrics(
+            {test: values for test, values in self.metrics.items() if test not in self.failed | self.skipped},
+            self.failed,
+        )
+        if not metrics:
+            return
+        self.regressions = self.store.regressions(metrics)
+        regressed = defaultdict(list)
+        for regression in self.regressions:
+            regressed[regression.test].append(regression.metric)
+        self.store.append({**self.versions, "time": time.time(), "metrics": metrics, "regressions": regressed})
+        if self.gate and self.regressions and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Prints all regressions"""
+        if not self.regressions:
+            return
+        terminalreporter.write_sep("=", f"Performance regressions against {self.store.path}")
+        terminalreporter.write_line(f"{'test metric':100} {'value':>10} {'baseline':>10} {'change':>8} {'p':>8}")
+        for regression in sorted(self.regressions, key=lambda x: x.p_value):
+            terminalreporter.write_line(
+                f"{regression.test + ' ' + regression.metric:100} {regression.value:10.3f}"
+                f" {regression.mean:10.3f} {regression.change:+8.1%} {regression.p_value:8.4f}"
+            )
@@ -0,0 +1,186 @@
+"""Recording of all OpenShift API interactions (oc invocations) into a cassette and their replay without a cluster"""
+import hashlib
+import json
+import os
+import shlex
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Optional
+
+# Arguments which differ between environments, but don't change the meaning of the invocation
+IGNORED_ARGS = ("--token=", "--server=", "--kubeconfig=", "--cacert=", "--loglevel=", "--insecure-skip-tls-verify")
+
+
+class CassetteMismatch(Exception):
+    """Replayed run made oc invocation which wasn't recorded"""
+
+
+def normalize(cmds: list[str]) -> tuple[str, ...]:
+    """Returns arguments of the oc invocation (without oc path and credentials), which identify the invocation"""
+    return tuple(arg for arg in cmds[1:] if not arg.startswith(IGNORED_ARGS))
+
+
+class _Exchange:
+    """Single replayed invocation, which pretends to be paramiko channel and its streams"""
+
+    def __init__(self, cassette: "Cassette", args: tuple[str, ...]) -> None:
+        self.cassette = cassette
+        self.args = args
+        self.stdin = ""
+        self._response: Optional[dict] = None
+
+    @property
+    def response(self) -> dict:
+        """Recorded response, it is looked up only after the whole input was sent"""
+        if self._response is None:
+            self._response = self.cassette.play(self.args, self.stdin)
+        return self._response
+
+    # paramiko API used by openshift-client
+    @property
+    def channel(self):
+        """Channel of the streams"""
+        return self
+
+    def write(self, data: str):
+        """Writes to stdin"""
+        self.stdin += data
+
+    def flush(self):
+        """Flushes stdin"""
+
+    def shutdown_write(self):
+        """Closes stdin"""
+
+    def recv_exit_status(self) -> int:
+        """Returns recorded exit status"""
+        return self.response["status"]
+
+
+class _Stream:
+    def __init__(self, exchange: _Exchange, name: str) -> None:
+        self.exchange = exchange
+        self.name = name
+        self.channel = exchange
+
+    def read(self) -> bytes:
+        """Returns recorded output"""
+        return self.exchange.response[self.name].encode()
+
+
+class Cassette:
+    """
+    Records every oc invocation together with its output, and values (e.g. random name suffixes)
+    which have to be the same in the replayed run. In replay mode it is used as ssh client of openshift-client,
+    so oc is never executed and invocations are served in the recorded order (per invocation arguments),
+    preferring the ones with the same input, so concurrent invocations (e.g. oc apply -f - from multiple threads)
+    get their own responses. When the recorded responses for the same invocation run out (e.g. waiting took
+    more polls), the last one is repeated.
+    """
+
+    def __init__(self) -> None:
+        self.mode: Optional[str] = None
+        self.path: Optional[str] = None
+        self.time_scale = 0.0
+        self.interactions: list[dict] = []
+        self.values: dict[str, list] = defaultdict(list)
+        self._queues: dict[tuple[str, ...], deque] = {}
+        self._last: dict[tuple[str, ...], dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self) -> bool:
+        """True if the invocations are recorded"""
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        """True if the invocations are served from the cassette"""
+        return self.mode == "replay"
+
+    def configure(self, mode: Optional[str], path: Optional[str], time_scale: float = 0.0):
+        """Starts recording or replaying, replay speed is real time with time_scale 1 and instant with 0"""
+        self.mode, self.path, self.time_scale = mode, path, time_scale
+        if self.replaying:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            self.values = defaultdict(list, data["values"])
+            self._queues = defaultdict(deque)
+            for interaction in data["interactions"]:
+                self._queues[tuple(interaction["args"])].append(interaction)
+
+    def save(self):
+        """Writes recorded cassette, if anything was recorded (e.g. xdist controller doesn't invoke oc)"""
+        if self.recording and self.path and (self.interactions or self.values):
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump({"values": self.values, "interactions": self.interactions}, file, separators=(",", ":"))
+
+    def value(self, kind: str, generate: Callable):
+        """Returns newly generated value, or the value generated in the same order in the recorded run"""
+        if self.replaying:
+            with self._lock:
+                if not self.values[kind]:
+                    raise CassetteMismatch(f"Cassette {self.path} has no more recorded values of '{kind}'")
+                return self.values[kind].pop(0)
+        value = generate()
+        if self.recording:
+            with self._lock:
+                self.values[kind].append(value)
+        return value
+
+    def record(self, action):
+        """Records finished oc invocation, used as a tracking strategy of openshift-client contexts"""
+        self.interactions.append(
+            {
+                "args": normalize(action.cmd),
+                "stdin": hashlib.sha256((action.stdin_str or "").encode()).hexdigest()[:12],
+                "out": action.out,
+                "err": action.err,
+                "status": action.status,
+                "elapsed": max(action.elapsed_time, 0),
+            }
+        )
+
+    def track(self, strategy: Callable) -> Callable:
+        """Returns tracking strategy, which also records the invocations if recording is enabled"""
+        if not self.recording:
+            return strategy
+
+        def _track(action):
+            self.record(action)
+            strategy(action)
+
+        return _track
+
+    def play(self, args: tuple[str, ...], stdin: str) -> dict:
+        """Returns recorded response for the invocation"""
+        stdin_hash = hashlib.sha256(stdin.encode()).hexdigest()[:12]
+        with self._lock:
+            queue = self._queues.get(args)
+            if queue:
+                # Input can differ from the recording, e.g. if it contains current time
+                response = next((item for item in queue if item["stdin"] == stdin_hash), queue[0])
+                queue.remove(response)
+                self._last[args] = response
+            response = self._last.get(args)
+        if response is None:
+            raise CassetteMismatch(f"Invocation 'oc {' '.join(args)}' (stdin {stdin_hash}) wasn't recorded")
+        if self.time_scale:
+            time.sleep(response["elapsed"] * self.time_scale)
+        return response
+
+    def exec_command(self, command: str, timeout=None, environment=None):  # pylint: disable=unused-argument
+        """Replays oc invocation, implements paramiko SSHClient API used by openshift-client"""
+        # Command is prefixed with PATH setting, followed by oc path and arguments
+        exchange = _Exchange(self, normalize(shlex.split(command)[1:]))
+        return exchange, _Stream(exchange, "out"), _Stream(exchange, "err")
+
+
+def worker_path(path: str) -> str:
+    """Returns cassette path of this xdist worker, as every worker makes different invocations"""
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    return f"{path}.{worker}" if worker else path
+
+
+CASSETTE = Cassette()
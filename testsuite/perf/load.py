@@ -0,0 +1,187 @@
+"""Simple load generator for benchmarks, which sends requests from multiple threads"""
+import dataclasses
+import socket
+import ssl
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from httpx import Response
+
+from testsuite.certificates import Certificate
+from testsuite.httpx import HttpxBackoffClient, RetryPolicy, create_tmp_file
+
+# Benchmarks measure every failure, clients must not retry
+NO_RETRY = RetryPolicy(deadline=0)
+
+
+@dataclasses.dataclass
+class LoadResult:
+    """Outcome of a single load run, latencies are in seconds"""
+
+    requests: int
+    errors: int
+    duration: float
+    latencies: list[float] = dataclasses.field(default_factory=list)
+    resumed: int = 0  # TLS sessions which were resumed, only for handshakes
+    timeline: list[tuple[float, bool]] = dataclasses.field(default_factory=list)  # (time sent, success) of requests
+
+    @property
+    def throughput(self) -> float:
+        """Successful requests per second"""
+        return (self.requests - self.errors) / self.duration if self.duration else 0.0
+
+    def percentile(self, percent: int) -> float:
+        """Returns latency percentile, e.g. 99 for p99"""
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[percent - 1]
+
+    def failures(self, since: float = 0) -> list[float]:
+        """Returns times (as in time.time()) when failed requests were sent, optionally only those sent since"""
+        return sorted(sent for sent, passed in self.timeline if not passed and sent >= since)
+
+    def properties(self, prefix: str) -> dict[str, float]:
+        """Returns metrics of the run, metrics which end with '_per_second' are better when higher"""
+        return {
+            f"{prefix}_requests_per_second": self.throughput,
+            f"{prefix}_latency_p50": self.percentile(50),
+            f"{prefix}_latency_p99": self.percentile(99),
+            f"{prefix}_errors": self.errors,
+        }
+
+
+def run_load(
+    client: HttpxBackoffClient,
+    path: str = "/get",
+    concurrency: int = 10,
+    requests: int = 1000,
+    duration: Optional[float] = None,
+    success: Callable[[Response], bool] = lambda response: response.status_code == 200,
+    stop: Optional[threading.Event] = None,
+) -> LoadResult:
+    """
+    Sends requests from multiple threads through a single client, either the given number of requests,
+    as many as possible during the duration (in seconds) or until the stop event is set
+    """
+    lock = threading.Lock()
+    result = LoadResult(0, 0, 0)
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+
+    def _finished():
+        if stop is not None and stop.is_set():
+            return True
+        if deadline is not None:
+            return time.perf_counter() > deadline
+        return stop is None and result.requests >= requests
+
+    def _worker():
+        while True:
+            with lock:
+                if _finished():
+                    return
+                result.requests += 1
+            timestamp = time.time()
+            sent = time.perf_counter()
+            try:
+                passed = success(client.get(path))
+            except Exception:  # pylint: disable=broad-except
+                passed = False
+            with lock:
+                result.latencies.append(time.perf_counter() - sent)
+                result.timeline.append((timestamp, passed))
+                result.errors += not passed
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(_worker)
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def tls_context(ca: Certificate, cert: Optional[Certificate] = None) -> ssl.SSLContext:
+    """Returns client TLS context, which trusts the CA and optionally presents client certificate"""
+    context = ssl.create_default_context(cadata=ca.certificate)
+    if cert is not None:
+        cert_file = create_tmp_file(cert.certificate)
+        key_file = create_tmp_file(cert.key)
+        with cert_file, key_file:
+            context.load_cert_chain(cert_file.name, key_file.name)
+    return context
+
+
+def _session(host: str, port: int, context: ssl.SSLContext) -> ssl.SSLSession:
+    """Returns TLS session, which can be resumed"""
+    with socket.create_connection((host, port), timeout=10) as raw:
+        with context.wrap_socket(raw, server_hostname=host) as tls:
+            # TLS 1.3 sends session tickets after the handshake, they are read together with the response
+            tls.sendall(f"HEAD / HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+            tls.recv(1024)
+            return tls.session
+
+
+def run_handshakes(
+    host: str,
+    context: ssl.SSLContext,
+    port: int = 443,
+    concurrency: int = 10,
+    handshakes: int = 500,
+    resume: bool = False,
+) -> LoadResult:
+    """
+    Opens new TLS connections from multiple threads and measures only the TLS handshakes,
+    optionally resuming the same session in all of them
+    """
+    session = _session(host, port, context) if resume else None
+    lock = threading.Lock()
+    result = LoadResult(0, 0, 0)
+    start = time.perf_counter()
+
+    def _worker():
+        while True:
+            with lock:
+                if result.requests >= handshakes:
+                    return
+                result.requests += 1
+            reused = False
+            sent = time.perf_counter()
+            try:
+                with socket.create_connection((host, port), timeout=10) as raw:
+                    sent = time.perf_counter()
+                    with context.wrap_socket(raw, server_hostname=host, session=session) as tls:
+                        latency = time.perf_counter() - sent
+                        reused = tls.session_reused
+                passed = True
+            except (OSError, ssl.SSLError):
+                latency, passed = time.perf_counter() - sent, False
+            with lock:
+                result.latencies.append(latency)
+                result.errors += not passed
+                result.resumed += reused
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(_worker)
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def wait_for_certificate(
+    host: str, context: ssl.SSLContext, certificate: Certificate, timeout: float, port: int = 443
+) -> Optional[float]:
+    """Returns seconds until the server presented the certificate, None if it didn't within timeout"""
+    expected = ssl.PEM_cert_to_DER_cert(certificate.certificate)
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        try:
+            with socket.create_connection((host, port), timeout=10) as raw:
+                with context.wrap_socket(raw, server_hostname=host) as tls:
+                    if tls.getpeercert(binary_form=True) == expected:
+                        return time.monotonic() - start
+        except (OSError, ssl.SSLError):
+            pass
+        time.sleep(0.2)
+    return None
@@ -0,0 +1,140 @@
+"""Ordering of the tests, which minimizes number of expensive fixtures being provisioned"""
+import itertools
+import logging
+from collections import Counter
+
+import pytest
+
+logger = logging.getLogger(__name__)
+
+EXPENSIVE_FIXTURES = ("backend", "sidecar_pool", "discovery_service", "certificates", "envoy_config", "envoy")
+
+
+def param_key(item) -> str:
+    """Returns identifier of the parameter combination of the test, e.g. 'EnvoyConfig-SidecarEnvoy'"""
+    callspec = getattr(item, "callspec", None)
+    return callspec.id if callspec else ""
+
+
+def _runs(items, key) -> list[list]:
+    """Splits items into runs of consecutive items with the same key"""
+    return [list(group) for _, group in itertools.groupby(items, key=key)]
+
+
+def _instance_key(item, fixture: str):
+    """Returns key identifying the fixture instance used by the test, different keys mean separate provisioning"""
+    # pylint: disable=protected-access
+    definitions = item._fixtureinfo.name2fixturedefs
+    definition = definitions[fixture][-1]
+    dependencies, pending = set(), [fixture]
+    while pending:
+        name = pending.pop()
+        if name in dependencies or name not in definitions:
+            continue
+        dependencies.add(name)
+        pending.extend(definitions[name][-1].argnames)
+    callspec = getattr(item, "callspec", None)
+    params = tuple(
+        sorted((name, str(callspec.params[name])) for name in dependencies if callspec and name in callspec.params)
+    )
+    scope = {"session": None, "package": item.path.parent, "module": item.path}.get(definition.scope, item.nodeid)
+    return definition.scope, scope, params
+
+
+def provisioning_events(items, fixtures=EXPENSIVE_FIXTURES) -> int:
+    """Estimates how many times will the fixtures be set up, if the tests run in this order"""
+    events = 0
+    live: dict = {}
+    previous = None
+    for item in items:
+        if previous is not None and previous.path != item.path:
+            live = {name: key for name, key in live.items() if key[0] not in ("module", "class", "function")}
+        for fixture in fixtures:
+            if fixture not in item.fixturenames:
+                continue
+            key = _instance_key(item, fixture)
+            if live.get(fixture) != key:
+                events += 1
+                live[fixture] = key
+        previous = item
+    return events
+
+
+def group_by_params(items) -> list:
+    """Groups all tests with the same parameter combination together, regardless of their module"""
+    order = {key: index for index, key in reversed(list(enumerate(param_key(item) for item in items)))}
+    return sorted(items, key=lambda item: order[param_key(item)])
+
+
+def chain_modules(items) -> list:
+    """Keeps modules together, but starts each module with the parameter combination the previous one ended with"""
+    result: list = []
+    for module in _runs(items, key=lambda item: item.path):
+        runs = _runs(module, key=param_key)
+        if result:
+            last = param_key(result[-1])
+            for index, run in enumerate(runs):
+                if param_key(run[0]) == last:
+                    runs = runs[index:] + runs[:index]
+                    break
+        for run in runs:
+            result.extend(run)
+    return result
+
+
+class OrderingPlugin:
+    """
+    Pytest plugin, which reorders tests to the order with the least provisioning events of expensive fixtures
+    and tracks how many times were the expensive fixtures actually provisioned.
+    """
+
+    def __init__(self, reorder: bool = True, fixtures=EXPENSIVE_FIXTURES) -> None:
+        self.reorder = reorder
+        self.fixtures = fixtures
+        self.saved = 0
+        self.provisioned: Counter = Counter()
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items):
+        """Picks the cheapest of the known orderings, pytest ordering is kept if none of them is better"""
+        original = best = provisioning_events(items, self.fixtures)
+        ordered = items
+        if not self.reorder:
+            logger.info("Test ordering requires %d provisioning events", original)
+            return
+        for candidate in (chain_modules(items), group_by_params(items)):
+            events = provisioning_events(candidate, self.fixtures)
+            if events < best:
+                ordered, best = candidate, events
+        items[:] = ordered
+        self.saved = original - best
+        logger.info("Test ordering requires %d provisioning events, %d were saved by reordering", best, self.saved)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef):
+        """Counts provisioning of expensive fixtures"""
+        yield
+        if fixturedef.argname in self.fixtures:
+            self.provisioned[fixturedef.argname] += 1
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):  # pylint: disable=unused-argument
+        """Collects provisioning events from xdist workers"""
+        output = getattr(node, "workeroutput", {})
+        self.provisioned.update(output.get("provisioned", {}))
+        self.saved = max(self.saved, output.get("saved_provisioning", 0))
+
+    def pytest_sessionfinish(self, session):
+        """Exports provisioning events to xdist controller"""
+        if hasattr(session.config, "workeroutput"):
+            session.config.workeroutput["provisioned"] = dict(self.provisioned)
+            session.config.workeroutput["saved_provisioning"] = self.saved
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Prints how many times were expensive fixtures provisioned"""
+        if not self.provisioned:
+            return
+        terminalreporter.write_sep("=", "Provisioning of expensive fixtures")
+        for fixture in self.fixtures:
+            terminalreporter.write_line(f"{fixture:40} {self.provisioned[fixture]:6}")
+        terminalreporter.write_line(f"{'saved by test ordering':40} {self.saved:6}")
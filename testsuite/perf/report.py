@@ -0,0 +1,148 @@
+"""Performance data of every test (fixture timings, API calls, HTTP latencies) attached to HTML and JUnit reports"""
+import html
+import statistics
+import time
+from collections import defaultdict
+
+import pytest
+from pytest_html import extras
+
+from testsuite.httpx import LatencyLog
+from testsuite.perf.api import ApiRecorder
+
+# Upper bounds (in seconds) of HTTP latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, float("inf"))
+# Fixtures which took less than this (e.g. returned a constant) are left out of the breakdown
+MIN_FIXTURE_DURATION = 0.001
+
+
+def histogram(latencies: list[float]) -> list[tuple[float, int]]:
+    """Returns number of latencies in every bucket"""
+    counts = [0] * len(BUCKETS)
+    for latency in latencies:
+        counts[next(index for index, bound in enumerate(BUCKETS) if latency <= bound)] += 1
+    return list(zip(BUCKETS, counts))
+
+
+def render(phases: dict[str, dict[str, float]], properties: dict[str, float], latencies: list[float]) -> str:
+    """Returns HTML panel with the performance data of a single test"""
+    rows = []
+    for phase, fixtures in phases.items():
+        for fixture, duration in sorted(fixtures.items(), key=lambda x: -x[1]):
+            if duration < MIN_FIXTURE_DURATION:
+                continue
+            rows.append(f"<tr><td>{phase}</td><td>{html.escape(fixture)}</td><td>{duration:.3f}</td></tr>")
+    parts = [
+        "<div><h4>Performance</h4>",
+        "<table><tr><th>phase</th><th>fixture</th><th>seconds</th></tr>" + "".join(rows) + "</table>",
+        "<ul>"
+        + "".join(f"<li>{html.escape(name)}: {value:.3f}</li>" for name, value in properties.items() if "[" not in name)
+        + "</ul>",
+    ]
+    if latencies:
+        buckets = histogram(latencies)
+        peak = max(count for _, count in buckets)
+        bars = "".join(
+            f"<tr><td>&le; {bound * 1000:.0f} ms</td><td>{count}</td>"
+            f"<td><div style='background:#4a90d9;height:10px;width:{200 * count // peak}px'></div></td></tr>"
+            for bound, count in buckets
+            if bound != float("inf") or count
+        )
+        parts.append(f"<table><tr><th>latency</th><th>responses</th><th></th></tr>{bars}</table>")
+    parts.append("</div>")
+    return "".join(parts)
+
+
+class PerformanceReportPlugin:
+    """
+    Pytest plugin, which measures setup and teardown of every fixture, OpenShift API calls, HTTP latencies
+    and config propagation (waits for Envoy to load the config) of every test.
+    Results are added as properties to the report (and JUnit) and as a panel to pytest-html report.
+    """
+
+    def __init__(self, recorder: ApiRecorder, latencies: LatencyLog, html_enabled: bool) -> None:
+        self.recorder = recorder
+        self.latencies = latencies
+        self.html_enabled = html_enabled
+        self.phases: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.start = {"calls": 0, "operations": 0, "latencies": 0}
+        self.teardown_mark = None
+        self.call_duration = 0.0
+        # Time spent in setups of fixtures nested in each fixture being set up
+        self.nested: list[float] = []
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):  # pylint: disable=unused-argument
+        """Marks the beginning of the test"""
+        self.phases.clear()
+        self.call_duration = 0.0
+        self.start = {
+            "calls": len(self.recorder.calls),
+            "operations": len(self.recorder.operations),
+            "latencies": len(self.latencies.samples),
+        }
+        yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef):
+        """
+        Measures setup of the fixture, without fixtures it resolved during its setup (e.g. with getfixturevalue),
+        so every fixture is counted only once
+        """
+        self.nested.append(0.0)
+        start = time.perf_counter()
+        yield
+        duration = time.perf_counter() - start
+        self.phases["setup"][fixturedef.argname] += duration - self.nested.pop()
+        if self.nested:
+            self.nested[-1] += duration
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item):  # pylint: disable=unused-argument
+        """Fixtures are finalized one after another, teardown of each ends when the next one starts"""
+        self.teardown_mark = time.perf_counter()
+        yield
+        self.teardown_mark = None
+
+    def pytest_fixture_post_finalizer(self, fixturedef):
+        """Measures teardown of the fixture"""
+        if self.teardown_mark is not None:
+            now = time.perf_counter()
+            self.phases["teardown"][fixturedef.argname] += now - self.teardown_mark
+            self.teardown_mark = now
+
+    def properties(self, nodeid: str) -> dict[str, float]:
+        """Returns performance metrics of the test"""
+        operations = self.recorder.operations[self.start["operations"] :]
+        propagation = [op.duration for op in operations if op.name == "wait_for_config" and op.test == nodeid]
+        latencies = self.latencies.samples[self.start["latencies"] :]
+        properties = {
+            "call_seconds": self.call_duration,
+            "api_calls": len(self.recorder.calls) - self.start["calls"],
+            "http_responses": len(latencies),
+        }
+        if latencies:
+            properties["http_latency_p50"] = statistics.median(latencies)
+            properties["http_latency_max"] = max(latencies)
+        if propagation:
+            properties["config_propagation_seconds"] = max(propagation)
+        for phase, fixtures in self.phases.items():
+            for fixture, duration in fixtures.items():
+                if duration >= MIN_FIXTURE_DURATION:
+                    properties[f"{phase}_seconds[{fixture}]"] = duration
+        return properties
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        """Adds performance data to the teardown report, which is the last one of the test"""
+        outcome = yield
+        report = outcome.get_result()
+        if call.when == "call":
+            self.call_duration = call.duration
+        if call.when != "teardown":
+            return
+        properties = self.properties(item.nodeid)
+        report.user_properties = [*report.user_properties, *properties.items()]
+        if self.html_enabled:
+            latencies = self.latencies.samples[self.start["latencies"] :]
+            report.extras = [*getattr(report, "extras", []), extras.html(render(self.phases, properties, latencies))]
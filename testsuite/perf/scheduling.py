@@ -0,0 +1,128 @@
+"""Distribution of tests between xdist workers based on their historical durations"""
+import json
+import os
+import statistics
+import tempfile
+from collections import defaultdict
+from typing import Optional
+
+import pytest
+from xdist.scheduler import LoadScopeScheduling
+
+CACHE_KEY = "testsuite/durations"
+DEFAULT_DURATION = 30.0
+# Parameters of module scoped Envoy and EnvoyConfig, tests with the same values can reuse them
+SCOPE_PARAMS = ("envoy_class", "envoy_config_class")
+
+
+def scopes_path(testrun: str) -> str:
+    """Returns path to the file with work unit scopes of all tests, published by xdist workers of the testrun"""
+    return os.path.join(tempfile.gettempdir(), f"marin3r-scopes-{testrun}.json")
+
+
+def item_scope(item) -> tuple[str, str]:
+    """Returns module and ids of Envoy and EnvoyConfig parameters (e.g. 'Envoy-EnvoyConfig') of the test"""
+    module = item.nodeid.split("::", 1)[0]
+    callspec = getattr(item, "callspec", None)
+    if callspec is None:
+        return module, ""
+    values = [callspec.params[name] for name in SCOPE_PARAMS if name in callspec.params]
+    return module, "-".join(getattr(value, "__name__", str(value)) for value in values)
+
+
+def publish_scopes(items):
+    """Publishes work unit scopes of the tests collected by this xdist worker to the scheduler in the controller"""
+    testrun = os.environ.get("PYTEST_XDIST_TESTRUNUID")
+    if testrun is None:
+        return
+    path = scopes_path(testrun)
+    # All workers collect the same tests, file is replaced atomically so the scheduler never reads partial content
+    with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), suffix=".tmp", delete=False) as file:
+        json.dump({item.nodeid: item_scope(item) for item in items}, file)
+    os.replace(file.name, path)
+
+
+class CostScheduling(LoadScopeScheduling):  # pylint: disable=abstract-method
+    """
+    Splits tests into work units by module and Envoy and EnvoyConfig parameters, so a single module can run
+    on multiple workers, while tests which share module scoped Envoy and EnvoyConfig stay on the same worker.
+    The most expensive units, based on historical durations, are scheduled first to shorten the critical path.
+    Worker prefers units from the same module (to reuse module fixtures) or with the same parameters
+    as its previous unit.
+    """
+
+    def __init__(self, config, log=None, durations: Optional[dict[str, float]] = None) -> None:
+        super().__init__(config, log)
+        self.durations = durations or {}
+        self.default_duration = statistics.median(self.durations.values()) if self.durations else DEFAULT_DURATION
+        self.scopes: dict[str, tuple[str, str]] = {}
+        self.previous: dict = {}
+        self.path = scopes_path(config.getoption("testrunuid")) if config.getoption("testrunuid") else None
+        self.item_scopes: Optional[dict[str, list[str]]] = None
+
+    def _load_scopes(self) -> dict[str, list[str]]:
+        """Reads scopes published by workers, they are published during collection, before any scheduling"""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, TypeError, ValueError):
+            return {}
+
+    def _split_scope(self, nodeid: str) -> str:
+        if self.item_scopes is None:
+            self.item_scopes = self._load_scopes()
+        module, params = self.item_scopes.get(nodeid, (nodeid.split("::", 1)[0], ""))
+        scope = f"{module}[{params}]" if params else module
+        self.scopes[scope] = (module, params)
+        return scope
+
+    def cost(self, scope: str) -> float:
+        """Returns expected duration of all tests in a work unit"""
+        return sum(self.durations.get(nodeid, self.default_duration) for nodeid in self.workqueue[scope])
+
+    def _pick_scope(self, node) -> str:
+        """Returns the most suitable work unit for a node"""
+        candidates = sorted(self.workqueue, key=self.cost, reverse=True)
+        if node in self.previous:
+            module, params = self.scopes[self.previous[node]]
+            for scope in candidates:
+                if self.scopes[scope][0] == module:
+                    return scope
+            for scope in candidates:
+                if self.scopes[scope][1] == params:
+                    return scope
+        return candidates[0]
+
+    def _assign_work_unit(self, node) -> None:
+        scope = self._pick_scope(node)
+        self.previous[node] = scope
+        # Parent assigns the first work unit in the queue
+        self.workqueue.move_to_end(scope, last=False)
+        super()._assign_work_unit(node)
+
+
+class CostSchedulingPlugin:
+    """Pytest plugin, which records test durations and provides cost aware xdist scheduler"""
+
+    def __init__(self, config, enabled: bool) -> None:
+        self.cache = getattr(config, "cache", None)
+        self.enabled = enabled
+        self.durations: dict[str, float] = self.cache.get(CACHE_KEY, {}) if self.cache else {}
+        self.measured: dict[str, float] = defaultdict(float)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_make_scheduler(self, config, log):
+        """Replaces xdist scheduler, if enabled"""
+        if self.enabled:
+            return CostScheduling(config, log, self.durations)
+        return None
+
+    def pytest_runtest_logreport(self, report):
+        """Measures total duration of the test, including its setup and teardown"""
+        self.measured[report.nodeid] += report.duration
+
+    def pytest_sessionfinish(self):
+        """Stores measured durations for the next runs"""
+        if self.cache and self.measured:
+            self.durations.update(self.measured)
+            self.cache.set(CACHE_KEY, self.durations)
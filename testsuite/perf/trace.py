@@ -0,0 +1,155 @@
+"""Timeline of the environment setup, which can be exported in Chrome trace format (chrome://tracing or Perfetto)"""
+import dataclasses
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import pytest
+
+from testsuite.openshift.pods import condition_phases, timestamp
+from testsuite.perf.api import ApiRecorder
+
+
+@dataclasses.dataclass
+class Span:
+    """Named period of time on a specific track"""
+
+    name: str
+    start: float
+    duration: float
+    track: str
+    worker: str
+    category: str = "testsuite"
+    args: dict = dataclasses.field(default_factory=dict)
+
+
+class Tracer:
+    """
+    Collects spans which are not OpenShift API operations (those are already recorded by ApiRecorder),
+    e.g. test phases or timestamps of pod conditions reported by the cluster.
+    Does nothing unless enabled, so it doesn't make any additional API calls.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.spans: list[Span] = []
+        self.worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+    def add(self, name: str, start: float, end: float, track: str, category="testsuite", **args):
+        """Adds span with known start and end"""
+        if self.enabled:
+            self.spans.append(Span(name, start, end - start, track, self.worker, category, args))
+
+    @contextmanager
+    def span(self, name: str, track: Optional[str] = None, category="testsuite", **args):
+        """Records everything inside as a single span"""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.time(), track or threading.current_thread().name, category, **args)
+
+    def add_pods(self, pods):
+        """Adds startup phases of the pods, as reported by the cluster"""
+        for pod in pods:
+            for phase, start, end in condition_phases(pod):
+                self.add(phase, start, end, f"pod/{pod.name()}", "cluster")
+
+    def add_route(self, route):
+        """Adds time it took for the route to be admitted, as reported by the cluster"""
+        model = route.as_dict()
+        for ingress in model.get("status", {}).get("ingress", []):
+            for condition in ingress.get("conditions", []):
+                if condition["type"] == "Admitted" and condition.get("lastTransitionTime"):
+                    start = timestamp(model["metadata"]["creationTimestamp"])
+                    end = timestamp(condition["lastTransitionTime"])
+                    self.add("admission", start, end, f"route/{route.name()}", "cluster")
+
+    def export(self) -> list[dict]:
+        """Returns all spans in a serializable form"""
+        return [dataclasses.asdict(span) for span in self.spans]
+
+    def merge(self, spans: list[dict]):
+        """Merges spans exported by a different tracer, e.g. from xdist worker"""
+        self.spans.extend(Span(**span) for span in spans)
+
+    def chrome_trace(self, recorder: ApiRecorder) -> dict:
+        """Returns all spans and API operations in Chrome trace event format"""
+        spans = self.spans + [
+            Span(
+                op.name, op.start, op.duration, op.thread, op.worker, "api", {"calls": op.calls, "retries": op.retries}
+            )
+            for op in recorder.operations
+        ]
+        processes: dict[str, int] = {}
+        threads: dict[tuple[str, str], int] = {}
+        events = []
+        for span in sorted(spans, key=lambda x: x.start):
+            pid = processes.setdefault(span.worker, len(processes) + 1)
+            tid = threads.setdefault((span.worker, span.track), len(threads) + 1)
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start * 1_000_000,
+                    "dur": span.duration * 1_000_000,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": span.args,
+                }
+            )
+        metadata = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": worker}}
+            for worker, pid in processes.items()
+        ] + [
+            {"name": "thread_name", "ph": "M", "pid": processes[worker], "tid": tid, "args": {"name": track}}
+            for (worker, track), tid in threads.items()
+        ]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+
+TRACER = Tracer()
+
+
+class TracePlugin:
+    """Pytest plugin, which traces test phases and writes Chrome trace at the end of the session"""
+
+    def __init__(self, tracer: Tracer, recorder: ApiRecorder, path: str) -> None:
+        self.tracer = tracer
+        self.recorder = recorder
+        self.path = path
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        """Traces test setup"""
+        with self.tracer.span(f"setup {item.name}", "tests"):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        """Traces test call"""
+        with self.tracer.span(item.name, "tests"):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item):
+        """Traces test teardown"""
+        with self.tracer.span(f"teardown {item.name}", "tests"):
+            yield
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):  # pylint: disable=unused-argument
+        """Collects spans recorded by xdist workers"""
+        self.tracer.merge(getattr(node, "workeroutput", {}).get("trace", []))
+
+    def pytest_sessionfinish(self, session):
+        """Exports spans to xdist controller or writes the trace file"""
+        if hasattr(session.config, "workeroutput"):
+            session.config.workeroutput["trace"] = self.tracer.export()
+        else:
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(self.tracer.chrome_trace(self.recorder), file)
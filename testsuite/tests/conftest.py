@@ -1,11 +1,186 @@
 """Base conftest"""
+import logging
+import os
+import uuid
+
 import pytest
 
 from testsuite.config import settings
-from testsuite.openshift.envoy import DiscoveryService, Envoy, SidecarEnvoy
+from testsuite.openshift.envoy import DiscoveryService, Envoy, SidecarEnvoy, SidecarPool
+from testsuite.httpx import LATENCIES, RETRY_REPORT, RetryReportPlugin
 from testsuite.openshift.config import LegacyEnvoyConfig, EnvoyConfig
+from testsuite.openshift import facts, template
 from testsuite.openshift.httpbin import Httpbin
-from testsuite.utils import randomize, _whoami, create_simple_cluster
+from testsuite.openshift.lease import Leases
+from testsuite.openshift.prepull import ImagePrepull
+from testsuite.openshift.ratelimit import RATE_LIMITER, RateLimiterPlugin
+from testsuite.openshift.shared import SharedResources, default_path, testrun_path
+from testsuite.perf.api import API_RECORDER, ApiMetricsPlugin
+from testsuite.perf.baseline import BaselinePlugin, BaselineStore, git_commit
+from testsuite.perf.cassette import CASSETTE, worker_path
+from testsuite.perf.ordering import OrderingPlugin
+from testsuite.perf.report import PerformanceReportPlugin
+from testsuite.perf.scheduling import CostSchedulingPlugin, publish_scopes, scopes_path
+from testsuite.perf.trace import TRACER, TracePlugin
+from testsuite.utils import randomize, _whoami, create_simple_cluster, shard, worker_index
+
+logger = logging.getLogger(__name__)
+
+
+def pytest_addoption(parser):
+    """Add testsuite specific options"""
+    parser.addoption("--api-metrics", action="store", default=None, help="Export OpenShift API metrics to a JSON file")
+    parser.addoption("--chrome-trace", action="store", default=None, help="Write timeline of the run in Chrome format")
+    parser.addoption(
+        "--cost-scheduling",
+        action="store_true",
+        default=False,
+        help="Distribute tests between xdist workers based on their historical durations",
+    )
+    parser.addoption(
+        "--shared-infra",
+        action="store_true",
+        default=False,
+        help="Provision session resources (backend, discovery service) once and share them between xdist workers",
+    )
+    parser.addoption(
+        "--sharding",
+        choices=["pool", "ephemeral"],
+        default=None,
+        help="Give every xdist worker its own namespace, either from 'namespaces' setting or a newly created one",
+    )
+    parser.addoption(
+        "--performance",
+        action="store_true",
+        default=False,
+        help="Run performance benchmarks, they are skipped otherwise",
+    )
+    parser.addoption(
+        "--prepull",
+        action="store_true",
+        default=False,
+        help="Pull Envoy and Httpbin images on all nodes before the first test and report how long it took",
+    )
+    parser.addoption(
+        "--baseline",
+        action="store",
+        default=None,
+        help="Compare performance metrics of the run with past runs stored in the file and append the run to it",
+    )
+    parser.addoption(
+        "--baseline-gate",
+        action="store_true",
+        default=False,
+        help="Fail the run if any performance metric significantly regressed against the baseline",
+    )
+    parser.addoption(
+        "--record",
+        action="store",
+        default=None,
+        help="Record all OpenShift API interactions into a cassette file",
+    )
+    parser.addoption(
+        "--replay",
+        action="store",
+        default=None,
+        help="Serve OpenShift API interactions from a cassette file recorded by --record, no cluster is needed",
+    )
+    parser.addoption(
+        "--replay-time-scale",
+        action="store",
+        type=float,
+        default=0.0,
+        help="Replay interactions with their recorded duration multiplied by this, 0 (default) replays instantly",
+    )
+    parser.addoption(
+        "--reuse-infra",
+        action="store_true",
+        default=False,
+        help="Keep session resources (backend, discovery service) running after the run and reuse them in next runs",
+    )
+    parser.addoption(
+        "--keep-order",
+        action="store_true",
+        default=False,
+        help="Don't reorder tests to reduce provisioning of expensive fixtures",
+    )
+
+
+def pytest_configure(config):
+    """Register testsuite plugins"""
+    config.addinivalue_line("markers", "performance: Benchmark, which runs only with --performance")
+    if config.getoption("--sharding") and config.getoption("--shared-infra"):
+        raise pytest.UsageError("--shared-infra can't be used together with --sharding")
+    if config.getoption("--sharding") == "ephemeral" and config.getoption("--reuse-infra"):
+        raise pytest.UsageError("--reuse-infra can't be used together with --sharding=ephemeral")
+    if config.getoption("--record") and config.getoption("--replay"):
+        raise pytest.UsageError("--record can't be used together with --replay")
+    if config.getoption("--record"):
+        CASSETTE.configure("record", worker_path(config.getoption("--record")))
+    elif config.getoption("--replay"):
+        CASSETTE.configure("replay", worker_path(config.getoption("--replay")), config.getoption("--replay-time-scale"))
+    config.pluginmanager.register(ApiMetricsPlugin(API_RECORDER, config.getoption("--api-metrics")), "api_metrics")
+    if settings.get("rate_limit"):
+        try:
+            RATE_LIMITER.configure(settings["rate_limit"]["rate"], settings["rate_limit"].get("burst", 1))
+        except ValueError as error:
+            raise pytest.UsageError(f"Invalid rate_limit setting: {error}") from error
+    config.pluginmanager.register(RateLimiterPlugin(RATE_LIMITER), "rate_limiter")
+    config.pluginmanager.register(RetryReportPlugin(RETRY_REPORT), "http_retries")
+    config.pluginmanager.register(OrderingPlugin(not config.getoption("--keep-order")), "ordering")
+    config.pluginmanager.register(
+        PerformanceReportPlugin(API_RECORDER, LATENCIES, bool(config.getoption("htmlpath", None))), "performance_report"
+    )
+    if config.getoption("--chrome-trace"):
+        TRACER.enabled = True
+        config.pluginmanager.register(TracePlugin(TRACER, API_RECORDER, config.getoption("--chrome-trace")), "trace")
+    if not hasattr(config, "workerinput"):
+        if config.getoption("dist", "no") != "no" and not config.getoption("testrunuid", None):
+            # Testrun id shared with workers, so the controller can find files they share (e.g. work unit scopes)
+            config.option.testrunuid = uuid.uuid4().hex
+        config.pluginmanager.register(
+            CostSchedulingPlugin(config, config.getoption("--cost-scheduling")), "cost_scheduling"
+        )
+        if config.getoption("--baseline"):
+            versions = {
+                "commit": git_commit(),
+                "marin3r": settings.get("marin3r_version", "unknown"),
+                "envoy": settings["envoy"]["image"],
+            }
+            config.pluginmanager.register(
+                BaselinePlugin(
+                    BaselineStore(config.getoption("--baseline")),
+                    API_RECORDER,
+                    versions,
+                    config.getoption("--baseline-gate"),
+                ),
+                "baseline",
+            )
+
+
+def pytest_sessionfinish(session):
+    """Writes recorded cassette, controller removes files which xdist workers shared during the testrun"""
+    CASSETTE.save()
+    testrun = session.config.getoption("testrunuid", None)
+    if hasattr(session.config, "workerinput") or not testrun:
+        return
+    for path in (facts.testrun_path(testrun), testrun_path(testrun), scopes_path(testrun)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip performance benchmarks, unless enabled, and publish work unit scopes for the cost aware scheduler"""
+    if hasattr(config, "workerinput") and config.getoption("--cost-scheduling"):
+        publish_scopes(items)
+    if config.getoption("--performance"):
+        return
+    skip = pytest.mark.skip(reason="Performance benchmarks run only with --performance")
+    for item in items:
+        if "performance" in item.keywords:
+            item.add_marker(skip)
 
 
 @pytest.fixture(scope="session")
@@ -15,9 +190,17 @@ def testconfig():
 
 
 @pytest.fixture(scope="session")
-def openshift(testconfig):
-    """OpenShift client for the primary namespace"""
+def openshift(request, testconfig):
+    """OpenShift client for the primary namespace, or for the namespace of this worker if --sharding is enabled"""
     client = testconfig["openshift"]
+    sharding = request.config.getoption("--sharding")
+    if sharding == "pool":
+        if not testconfig.get("namespaces"):
+            pytest.fail("Sharding from a pool requires 'namespaces' setting")
+        client = client.change_project(shard(testconfig["namespaces"]))
+    elif sharding == "ephemeral":
+        client = client.new_project(randomize(f"marin3r-{_whoami()[:8].lower()}-gw{worker_index()}"))
+        request.addfinalizer(client.delete_project)
     if not client.connected:
         pytest.fail("You are not logged into Openshift or the namespace doesn't exist")
     return client
@@ -59,20 +242,138 @@ def label(blame):
 
 
 @pytest.fixture(scope="session")
-def backend(request, openshift, blame, label):
-    """Deploys Httpbin backend"""
-    httpbin = Httpbin(openshift, blame("httpbin"), label)
-    request.addfinalizer(httpbin.delete)
-    httpbin.commit()
+def shared(request):
+    """Registry of resources shared with other xdist workers, None if sharing is disabled"""
+    path = default_path()
+    if not request.config.getoption("--shared-infra") or path is None:
+        return None
+    return SharedResources(path)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def prepull(request, testconfig, blame, shared, record_testsuite_property):
+    """Pulls Envoy and Httpbin images on all schedulable nodes, if enabled. Only once per run with --shared-infra"""
+    if not request.config.getoption("--prepull"):
+        return
+    tools = testconfig.get("prepull", {})
+    if not tools.get("busybox_image") or not tools.get("pause_image"):
+        pytest.fail("--prepull requires 'prepull.busybox_image' and 'prepull.pause_image' settings")
+
+    def _pull():
+        warmup = ImagePrepull(
+            request.getfixturevalue("openshift"),
+            blame("prepull"),
+            [testconfig["envoy"]["image"], *template.load(Httpbin.TEMPLATE).images],
+            tools["busybox_image"],
+            tools["pause_image"],
+        )
+        try:
+            warmup.commit()
+        finally:
+            warmup.delete()
+        return warmup.times
+
+    times = _pull() if shared is None else shared.acquire("prepull", _pull)
+    for node, images in times.items():
+        for image, seconds in images.items():
+            logger.info("Image %s was pulled on node %s in %.2fs", image, node, seconds)
+            record_testsuite_property(f"prepull_seconds[{node}][{image}]", seconds)
+
+
+@pytest.fixture(scope="session")
+def leases(request, openshift):
+    """Leases of session resources which are kept for the next runs, None if --reuse-infra is disabled"""
+    if not request.config.getoption("--reuse-infra"):
+        return None
+    return Leases(openshift, _whoami())
+
+
+def lease_name(resource, shared):
+    """Name of the lease, every xdist worker has its own resources unless they are shared"""
+    return resource if shared is not None else f"{resource}-gw{worker_index()}"
+
+
+@pytest.fixture(scope="session")
+def backend(request, openshift, blame, label, shared, leases):
+    """
+    Deploys Httpbin backend, it is shared with other xdist workers if --shared-infra is enabled
+    and kept for the next runs if --reuse-infra is enabled
+    """
+    if shared is None and leases is None:
+        httpbin = Httpbin(openshift, blame("httpbin"), label)
+        request.addfinalizer(httpbin.delete)
+        httpbin.commit()
+        return httpbin
+
+    def _create():
+        httpbin = Httpbin(openshift, blame("httpbin"), label)
+        httpbin.commit()
+        return httpbin.export()
+
+    if leases is not None:
+
+        def _lease():
+            return leases.acquire(
+                lease_name("backend", shared), _create, lambda data: Httpbin.attach(openshift, data).healthy()
+            )
+
+        return Httpbin.attach(openshift, _lease() if shared is None else shared.acquire("backend", _lease))
+
+    httpbin = Httpbin.attach(openshift, shared.acquire("backend", _create))
+    request.addfinalizer(lambda: shared.release("backend", lambda _: httpbin.delete()))
+    return httpbin
+
+
+@pytest.fixture(scope="session")
+def sidecar_pool(request, openshift, blame, label, leases):
+    """
+    Backends for Envoys injected as a sidecar, those modify their deployment, so they aren't shared,
+    but they are kept for the next runs if --reuse-infra is enabled
+    """
+    pool = SidecarPool(openshift, blame, label, leases)
+    request.addfinalizer(pool.delete)
+    return pool
+
+
+@pytest.fixture(scope="module")
+def sidecar_backend(request, sidecar_pool):
+    """Backend with the sidecar Envoy, leased from the pool for the module"""
+    httpbin = sidecar_pool.lease()
+    request.addfinalizer(lambda: sidecar_pool.release(httpbin))
     return httpbin
 
 
 @pytest.fixture(scope="session")
-def discovery_service(request, openshift, blame, label):
-    """Discovery Service to be used in tests"""
-    service = DiscoveryService.create_instance(openshift, blame("discovery_service"), {"app": label})
-    request.addfinalizer(service.delete)
-    service.commit()
+def discovery_service(request, openshift, blame, label, shared, leases):
+    """
+    Discovery Service to be used in tests, it is shared with other xdist workers if --shared-infra is enabled
+    and kept for the next runs if --reuse-infra is enabled
+    """
+    if shared is None and leases is None:
+        service = DiscoveryService.create_instance(openshift, blame("discovery_service"), {"app": label})
+        request.addfinalizer(service.delete)
+        service.commit()
+        return service
+
+    def _create():
+        service = DiscoveryService.create_instance(openshift, blame("discovery_service"), {"app": label})
+        service.commit()
+        return {"name": service.name(), "objects": [service.qname()]}
+
+    if leases is not None:
+
+        def _lease():
+            return leases.acquire(
+                lease_name("discovery_service", shared),
+                _create,
+                lambda data: DiscoveryService.healthy(openshift, data["name"]),
+            )
+
+        data = _lease() if shared is None else shared.acquire("discovery_service", _lease)
+        return DiscoveryService.attach(openshift, data["name"])
+
+    service = DiscoveryService.attach(openshift, shared.acquire("discovery_service", _create)["name"])
+    request.addfinalizer(lambda: shared.release("discovery_service", lambda _: service.delete()))
     return service
 
 
@@ -166,7 +467,10 @@ def envoy_config(
     envoy_class,
     envoy_config_class,
 ):
-    """EnvoyConfig"""
+    """EnvoyConfig, Envoy injected as a sidecar uses node-id of its backend"""
+    node_id = None
+    if envoy_class is SidecarEnvoy:
+        node_id = SidecarPool.node_id(request.getfixturevalue("sidecar_backend"))
     config = envoy_config_class.create_instance(
         openshift,
         blame("config"),
@@ -177,6 +481,7 @@ def envoy_config(
         routes,
         scoped_routes,
         secrets,
+        node_id=node_id,
     )
     request.addfinalizer(config.delete)
     config.commit()
@@ -208,6 +513,8 @@ def envoy(
     use_tls,
 ):
     """Envoy to be used in tests"""
+    if envoy_class is SidecarEnvoy:
+        backend = request.getfixturevalue("sidecar_backend")
     envoy = envoy_class(
         openshift,
         blame("envoy"),
@@ -222,6 +529,19 @@ def envoy(
     return envoy
 
 
+@pytest.fixture(autouse=True)
+def envoy_startup(request, record_property):
+    """Attaches the slowest duration of every startup phase of the Envoy pods to the report of tests using Envoy"""
+    if "envoy" not in request.fixturenames:
+        return
+    phases: dict[str, float] = {}
+    for breakdown in request.getfixturevalue("envoy").startup.values():
+        for phase, duration in breakdown.items():
+            phases[phase] = max(phases.get(phase, 0.0), duration)
+    for phase, duration in phases.items():
+        record_property(f"envoy_startup_{phase}", duration)
+
+
 @pytest.fixture(scope="module")
 def client(envoy):
     """Default HTTPX client for connecting to envoy"""
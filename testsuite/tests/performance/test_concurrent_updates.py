@@ -0,0 +1,200 @@
+"""
+Many writers (e.g. GitOps tooling and operators) concurrently update the same EnvoyConfig or each its own,
+measures conflicts, retries and time until the config is reconciled and checks that no successful write was lost
+"""
+import dataclasses
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import pytest
+import yaml
+
+from testsuite.openshift.config import BaseEnvoyConfig, LegacyEnvoyConfig
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance]
+
+WRITERS = 8
+WRITES = 5
+RETRIES = 5
+TIMEOUT = 120
+# Error of the API server when the write was based on an outdated resourceVersion
+CONFLICT = "the object has been modified"
+
+
+@dataclasses.dataclass
+class Write:
+    """Single modify_and_apply of a writer"""
+
+    config: str
+    value: str
+    previous: Optional[str]  # Value the successful attempt was based on
+    attempts: int
+    conflicts: int
+    applied: bool
+    duration: float
+
+
+def connect_timeout(config: BaseEnvoyConfig) -> str:
+    """Returns connect_timeout of the httpbin cluster, which is used as the value written by writers"""
+    if isinstance(config, LegacyEnvoyConfig):
+        return yaml.safe_load(config.model.spec.envoyResources.clusters[0]["value"])["connect_timeout"]
+    return next(
+        resource.value.connect_timeout for resource in config.model.spec.resources if resource.type == "cluster"
+    )
+
+
+def set_connect_timeout(config: BaseEnvoyConfig, value: str):
+    """Sets connect_timeout of the httpbin cluster"""
+    if isinstance(config, LegacyEnvoyConfig):
+        cluster = yaml.safe_load(config.model.spec.envoyResources.clusters[0]["value"])
+        cluster["connect_timeout"] = value
+        config.model.spec.envoyResources.clusters = [{"value": yaml.dump(cluster)}]
+        return
+    for resource in config.model.spec.resources:
+        if resource.type == "cluster":
+            resource.value.connect_timeout = value
+
+
+def write(config: BaseEnvoyConfig, number: int) -> Write:
+    """Writes unique value based on the current state of the config, as a controller would"""
+    config = type(config)(config.as_dict(), context=config.context)
+    value = f"{1 + number / 1000:.3f}s"
+    seen = []
+
+    def _apply(obj):
+        seen.append(connect_timeout(obj))
+        set_connect_timeout(obj, value)
+
+    start = time.perf_counter()
+    config.refresh()
+    result, applied = config.modify_and_apply(_apply, retries=RETRIES)
+    actions = result.actions()
+    return Write(
+        config.name(),
+        value,
+        seen[-1],
+        len(actions),
+        sum(1 for action in actions if action.status != 0 and CONFLICT in action.err),
+        applied,
+        time.perf_counter() - start,
+    )
+
+
+def run_writers(configs: list[BaseEnvoyConfig]) -> tuple[list[Write], float]:
+    """Every writer sequentially writes to its config, returns all writes and duration of the whole run"""
+
+    def _writer(index):
+        return [write(configs[index], index * WRITES + number + 1) for number in range(WRITES)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(WRITERS) as executor:
+        writes = [item for items in executor.map(_writer, range(WRITERS)) for item in items]
+    return writes, time.perf_counter() - start
+
+
+def last_write(initial: str, writes: list[Write]) -> Optional[Write]:
+    """
+    Returns the last successful write to the config, every successful write has to be based on the value
+    of the previous one. Returns None if some write was lost, i.e. two writes were based on the same value.
+    """
+    following = {}
+    for item in writes:
+        if item.applied:
+            if item.previous in following:
+                return None
+            following[item.previous] = item
+    current, last = initial, None
+    while current in following:
+        last = following.pop(current)
+        current = last.value
+    return None if following else last
+
+
+def wait_reconciled(configs: list[BaseEnvoyConfig], versions: dict[str, str]) -> Optional[float]:
+    """Returns seconds until all configs published a new version, None on timeout"""
+    start = time.perf_counter()
+    for config in configs:
+        if not config.wait_published(versions[config.name()], TIMEOUT):
+            return None
+    return time.perf_counter() - start
+
+
+def properties(prefix: str, writes: list[Write], duration: float, reconciled: Optional[float]) -> dict[str, float]:
+    """Returns write throughput, conflicts, retries, latency of applied writes and time until reconciled"""
+    attempts = sum(item.attempts for item in writes)
+    latencies = [item.duration for item in writes if item.applied]
+    return {
+        f"{prefix}_writes_per_second": len(latencies) / duration,
+        f"{prefix}_failed_writes": len(writes) - len(latencies),
+        f"{prefix}_conflict_rate": sum(item.conflicts for item in writes) / attempts,
+        f"{prefix}_retries": attempts - len(writes),
+        f"{prefix}_write_latency_p50": statistics.median(latencies) if latencies else 0.0,
+        f"{prefix}_write_latency_max": max(latencies, default=0.0),
+        f"{prefix}_in_sync_seconds": reconciled if reconciled is not None else TIMEOUT,
+    }
+
+
+@pytest.fixture(scope="module")
+def configs(request, openshift, blame, envoy_config_class, listeners, clusters):
+    """EnvoyConfig for every writer"""
+    configs = []
+    for _ in range(WRITERS):
+        config = envoy_config_class.create_instance(openshift, blame("config"), listeners, clusters)
+        request.addfinalizer(config.delete)
+        config.commit()
+        assert config.wait_status(BaseEnvoyConfig.Status.InSync), f"{config.name()} wasn't published in time"
+        configs.append(config)
+    return configs
+
+
+def check_writes(configs: list[BaseEnvoyConfig], initial: str, writes: list[Write]):
+    """Checks that final state of every config matches its last successful write"""
+    for config in {config.name(): config for config in configs}.values():
+        last = last_write(initial, [item for item in writes if item.config == config.name()])
+        assert last is not None, f"Some successful write to {config.name()} was lost"
+        assert connect_timeout(config.refresh()) == last.value, f"{config.name()} doesn't match the last write"
+
+
+def test_same_config(envoy, envoy_config, record_property):
+    """All writers update the EnvoyConfig used by Envoy, checks that Envoy loads the final version"""
+    initial = connect_timeout(envoy_config.refresh())
+    versions = {envoy_config.name(): envoy_config.published_version}
+
+    writes, duration = run_writers([envoy_config] * WRITERS)
+    reconciled = wait_reconciled([envoy_config], versions)
+    start = time.perf_counter()
+    loaded = envoy.wait_for_config(timeout=TIMEOUT)
+
+    metrics = properties("same_config", writes, duration, reconciled)
+    metrics["same_config_envoy_loaded_seconds"] = time.perf_counter() - start if loaded else TIMEOUT
+    for name, value in metrics.items():
+        record_property(name, value)
+    logger.info("Concurrent writes to the same config: %s", metrics)
+
+    assert any(item.applied for item in writes), "No write was applied"
+    assert reconciled is not None, "EnvoyConfig didn't publish the final version in time"
+    assert loaded, "Envoy didn't load the final version in time"
+    check_writes([envoy_config], initial, writes)
+
+
+def test_different_configs(configs, record_property):
+    """Every writer updates its own EnvoyConfig, so writers contend only for the API server and marin3r"""
+    initial = connect_timeout(configs[0])
+    versions = {config.name(): config.published_version for config in configs}
+
+    writes, duration = run_writers(configs)
+    reconciled = wait_reconciled(configs, versions)
+
+    metrics = properties("different_configs", writes, duration, reconciled)
+    for name, value in metrics.items():
+        record_property(name, value)
+    logger.info("Concurrent writes to different configs: %s", metrics)
+
+    assert all(item.applied for item in writes), "Some writes failed even though there was only one writer"
+    assert reconciled is not None, "Some EnvoyConfigs didn't publish the final version in time"
+    check_writes(configs, initial, writes)
@@ -2,22 +2,33 @@
 import pytest
 from openshift import OpenShiftPythonException
 
+from testsuite.openshift.validation import InvalidConfig
+
+INVALID_LISTENER = """
+name: http
+enable_reuse_port: false
+address: MISSING
+"""
+
 
 def test_reject_invalid_config(openshift, blame, envoy_config_class):
     """Invalid configuration should be rejected by a webhook"""
     config = envoy_config_class.create_instance(
         openshift,
         blame("config"),
-        [
-            """
-name: http
-enable_reuse_port: false
-address: MISSING
-    """
-        ],
+        [INVALID_LISTENER],
     )
 
     with pytest.raises(OpenShiftPythonException) as exc:
-        config.commit()
+        config.commit(validate=False)
 
     assert 'admission webhook "envoyconfig.marin3r.3scale.net-v1alpha1" denied the request' in exc.value.result.err()
+
+
+def test_reject_locally(openshift, blame, envoy_config_class):
+    """Invalid configuration should be rejected by the local validator, before it is sent to the cluster"""
+    config = envoy_config_class.create_instance(openshift, blame("config"), [INVALID_LISTENER])
+
+    with pytest.raises(InvalidConfig, match="address: must be an Address object"):
+        config.commit()
+    assert not config.committed
@@ -1,9 +1,19 @@
 """Tests if rollback functionality works as expected, e.g. rejected configuration should be rolled back
 https://github.com/3scale-ops/marin3r/blob/main/docs/walkthroughs/self-healing.md
 """
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import yaml
 
 from testsuite.openshift.config import BaseEnvoyConfig, LegacyEnvoyConfig
+from testsuite.perf.load import NO_RETRY, run_load
+
+logger = logging.getLogger(__name__)
+
+COOLDOWN = 3
 
 # You cannot change socket_options with envoy 1.25, and the update should be rejected
 INVALID_LISTENER_CHANGE = """
@@ -59,13 +69,39 @@ def update_config(config: BaseEnvoyConfig):
     assert success, f"Config wasn't updated: {result}"
 
 
-def test_rollback(client, envoy_config):
-    """Tests if the incorrect configuration will be rolled back and won't stop working"""
+def test_rollback(client, envoy, envoy_config, record_property):
+    """
+    Tests if the incorrect configuration will be rolled back and won't stop working,
+    measures how long the rollback takes and which requests failed meanwhile under continuous traffic
+    """
     response = client.get("/get")
     assert response.status_code == 200
 
-    update_config(envoy_config)
-    assert envoy_config.wait_status(BaseEnvoyConfig.Status.Rollback)
+    stop = threading.Event()
+    with envoy.client(retry_policy=NO_RETRY) as load_client, ThreadPoolExecutor(1) as executor:
+        load = executor.submit(run_load, load_client, concurrency=2, stop=stop)
+        try:
+            start = time.time()
+            update_config(envoy_config)
+            rolled_back = envoy_config.wait_status(BaseEnvoyConfig.Status.Rollback)
+            rollback = time.time() - start
+            time.sleep(COOLDOWN)
+        finally:
+            stop.set()
+    failures = load.result().failures(since=start)
+
+    record_property("rollback_seconds", rollback)
+    record_property("rollback_failed_requests", len(failures))
+    record_property("rollback_error_window_start", failures[0] - start if failures else 0)
+    record_property("rollback_error_window", failures[-1] - failures[0] if failures else 0)
+    logger.info(
+        "Rollback took %.2fs, %d requests failed between %.2fs and %.2fs after the update",
+        rollback,
+        len(failures),
+        failures[0] - start if failures else 0,
+        failures[-1] - start if failures else 0,
+    )
+    assert rolled_back
 
     response = client.get("/get")
     assert response.status_code == 200
@@ -0,0 +1,33 @@
+"""Tests that importing the testsuite and loading its settings is fast and doesn't initialize OpenShift client"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BUDGET = 1.0  # seconds
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import testsuite.utils
+from testsuite.config import settings
+settings.get("cfssl")
+settings.get("openshift")
+print(json.dumps({"duration": time.perf_counter() - start, "openshift": "openshift" in sys.modules}))
+"""
+
+
+def test_startup(testconfig):
+    """Importing testsuite and loading settings should not import openshift-client and should fit into a budget"""
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        capture_output=True,
+        check=True,
+        text=True,
+        cwd=Path(__file__).parents[2],
+    )
+    startup = json.loads(result.stdout.splitlines()[-1])
+
+    assert not startup["openshift"], "Loading settings imported openshift-client"
+    budget = testconfig.get("startup_budget", BUDGET)
+    assert startup["duration"] < budget, f"Startup took {startup['duration']:.2f}s, budget is {budget}s"
@@ -48,13 +48,15 @@ def update_config(config: BaseEnvoyConfig):
     assert success, f"Config wasn't updated: {result}"
 
 
-def test_update_config(client, envoy_config):
+def test_update_config(client, envoy, envoy_config):
     """Tests if updated config is applied"""
     response = client.get("/get")
     assert response.status_code == 200
 
+    previous_version = envoy_config.published_version
     update_config(envoy_config)
-    assert envoy_config.wait_status(BaseEnvoyConfig.Status.InSync)
+    assert envoy_config.wait_published(previous_version), "Updated config wasn't published in time"
+    assert envoy.wait_for_config(), "Envoy didn't load the updated config in time"
 
     client.retry_codes = {}
     response = client.get("/get")
@@ -0,0 +1,61 @@
+"""Conftest for TLS benchmarks"""
+import pytest
+
+
+@pytest.fixture(scope="module")
+def client_certificate():
+    """True, if Envoy should require client certificate"""
+    return False
+
+
+@pytest.fixture(scope="module")
+def listeners(envoy_ca, envoy_cert, client_certificate):
+    """TLS listener, which negotiates HTTP/2 or HTTP/1.1 through ALPN"""
+    validation = (
+        f"""
+            validation_context_sds_secret_config:
+              name: {envoy_ca}
+              sds_config: {{ ads: {{}}, resource_api_version: "V3" }}"""
+        if client_certificate
+        else ""
+    )
+    return [
+        f"""
+name: http
+address:
+    socket_address:
+      address: 0.0.0.0
+      port_value: 8000
+filter_chains:
+  - transport_socket:
+      name: envoy.transport_sockets.tls
+      typed_config:
+        "@type": type.googleapis.com/envoy.extensions.transport_sockets.tls.v3.DownstreamTlsContext
+        require_client_certificate: {str(client_certificate).lower()}
+        common_tls_context:
+            alpn_protocols: ["h2", "http/1.1"]
+            tls_certificate_sds_secret_configs:
+              - name: {envoy_cert}
+                sds_config: {{ ads: {{}}, resource_api_version: "V3" }}{validation}
+    filters:
+    - name: envoy.http_connection_manager
+      typed_config:
+        "@type": type.googleapis.com/envoy.extensions.filters.network.http_connection_manager.v3.HttpConnectionManager
+        stat_prefix: local
+        codec_type: AUTO
+        use_remote_address: true
+        http2_protocol_options:
+          max_concurrent_streams: 100
+        route_config:
+          name: local_route
+          virtual_hosts:
+          - name: local_service
+            domains: ['*']
+            routes:
+            - {{ match: {{ prefix: "/" }}, route: {{ cluster: "httpbin" }}}}
+        http_filters:
+            - name: envoy.filters.http.router
+              typed_config:
+                "@type": type.googleapis.com/envoy.extensions.filters.http.router.v3.Router
+        """
+    ]
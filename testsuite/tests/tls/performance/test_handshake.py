@@ -0,0 +1,80 @@
+"""
+Measures rate and latency of mTLS handshakes with Envoy per key algorithm, with and without session resumption.
+Handshakes use TLS 1.2, as TLS 1.3 client finishes the handshake before the server verifies its certificate.
+"""
+import logging
+import ssl
+
+import pytest
+
+from testsuite.certificates import CertInfo
+from testsuite.perf.load import run_handshakes, tls_context
+from testsuite.utils import cert_builder
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance]
+
+CONCURRENCY = 10
+HANDSHAKES = 500
+
+KEYS = {
+    "rsa2048": {"algo": "rsa", "size": 2048},
+    "rsa4096": {"algo": "rsa", "size": 4096},
+    "ecdsa256": {"algo": "ecdsa", "size": 256},
+}
+
+
+@pytest.fixture(scope="module", params=list(KEYS))
+def key_algorithm(request):
+    """Key algorithm of the Envoy and client certificates"""
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def certificates(cfssl, wildcard_domain, key_algorithm):
+    """Certificate hierarchy with all leaf certificates using the key algorithm"""
+    key = KEYS[key_algorithm]
+    chain = {"envoy_ca": CertInfo(key=key, children={"envoy_cert": CertInfo(key=key), "valid_cert": CertInfo(key=key)})}
+    return cert_builder(cfssl, chain, wildcard_domain)
+
+
+@pytest.fixture(scope="module")
+def client_certificate():
+    """Envoy requires client certificate"""
+    return True
+
+
+@pytest.mark.parametrize("resume", [False, True], ids=["full", "resumed"])
+def test_handshake(envoy, certificates, testconfig, record_property, key_algorithm, resume):
+    """Opens new mTLS connections to Envoy and measures the handshakes"""
+    context = tls_context(certificates["envoy_ca"], certificates["valid_cert"])
+    # Measured handshake has to include verification of the client certificate by Envoy
+    context.maximum_version = ssl.TLSVersion.TLSv1_2
+    with envoy.client(verify=certificates["envoy_ca"], cert=certificates["valid_cert"]) as client:
+        # Wait until the route is admitted and Envoy serves the certificate
+        assert client.get("/get").status_code == 200
+
+    result = run_handshakes(
+        envoy.route.hostname, context, concurrency=CONCURRENCY, handshakes=HANDSHAKES, resume=resume
+    )
+
+    prefix = f"{key_algorithm}_{'resumed' if resume else 'full'}_handshake"
+    record_property("envoy_image", testconfig["envoy"]["image"])
+    record_property(f"{prefix}s_per_second", result.throughput)
+    record_property(f"{prefix}_latency_p50", result.percentile(50))
+    record_property(f"{prefix}_latency_p99", result.percentile(99))
+    record_property(f"{prefix}_errors", result.errors)
+    logger.info(
+        "%s: %.1f handshakes/s, p50 %.1fms, p99 %.1fms, %d errors, %d resumed",
+        prefix,
+        result.throughput,
+        result.percentile(50) * 1000,
+        result.percentile(99) * 1000,
+        result.errors,
+        result.resumed,
+    )
+
+    assert result.errors == 0
+    if resume:
+        assert result.resumed > 0, "Envoy didn't resume any TLS session"
@@ -0,0 +1,44 @@
+"""Compares HTTP/1.1 and HTTP/2 (multiplexed on a single connection) performance through passthrough TLS route"""
+import logging
+
+import pytest
+
+from testsuite.perf.load import NO_RETRY, run_load
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance]
+
+CONCURRENCY = 20
+REQUESTS = 2000
+
+
+@pytest.mark.parametrize("http2", [False, True], ids=["http1", "http2"])
+def test_http_protocol(envoy, certificates, record_property, http2):
+    """Drives the same workload over HTTP/1.1 and HTTP/2 and reports throughput, latency and connections"""
+    protocol = "http2" if http2 else "http1"
+    with envoy.client(verify=certificates["envoy_ca"], http2=http2) as client:
+        # Wait for route admission with retries, so it doesn't fail the measured run
+        assert client.get("/get").status_code == 200
+    with envoy.client(verify=certificates["envoy_ca"], http2=http2, retry_policy=NO_RETRY) as client:
+        # Warm up, so the TLS handshake is not part of the measurement
+        assert client.get("/get").http_version == ("HTTP/2" if http2 else "HTTP/1.1")
+        before = envoy.stats("^http.local.downstream_cx_total$")
+        result = run_load(client, concurrency=CONCURRENCY, requests=REQUESTS)
+        after = envoy.stats("^http.local.downstream_cx_total$")
+
+    connections = after["http.local.downstream_cx_total"] - before["http.local.downstream_cx_total"]
+    for name, value in result.properties(protocol).items():
+        record_property(name, value)
+    record_property(f"{protocol}_connections", connections)
+    logger.info(
+        "%s: %.1f req/s, p50 %.1fms, p99 %.1fms, %d errors, %d new connections",
+        protocol,
+        result.throughput,
+        result.percentile(50) * 1000,
+        result.percentile(99) * 1000,
+        result.errors,
+        connections,
+    )
+
+    assert result.errors == 0
@@ -0,0 +1,93 @@
+"""Rotates Envoy serving certificate and validation CA under load and measures the impact on clients"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from httpx import Limits
+
+from testsuite.certificates import CertInfo, Certificate
+from testsuite.perf.load import NO_RETRY, run_load, tls_context, wait_for_certificate
+from testsuite.utils import cert_builder
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance]
+
+WARMUP = 5
+COOLDOWN = 5
+TIMEOUT = 120
+
+
+@pytest.fixture(scope="module")
+def certificates(cfssl, wildcard_domain):
+    """Current certificate hierarchy and the one Envoy is rotated to"""
+    chain = {
+        "envoy_ca": CertInfo(children={"envoy_cert": None, "valid_cert": None}),
+        "rotated_ca": CertInfo(children={"rotated_cert": None}),
+    }
+    return cert_builder(cfssl, chain, wildcard_domain)
+
+
+@pytest.fixture(scope="module")
+def client_certificate():
+    """Envoy requires client certificate"""
+    return True
+
+
+@pytest.fixture(scope="module")
+def trusted(certificates):
+    """Bundle of both CAs, trusted by clients and Envoy during the rotation"""
+    return Certificate(
+        key=certificates["rotated_ca"].key,
+        certificate=certificates["rotated_ca"].certificate + certificates["envoy_ca"].certificate,
+    )
+
+
+# pylint: disable=too-many-locals
+def test_rotation(openshift, envoy, envoy_ca, envoy_cert, certificates, trusted, record_property):
+    """
+    Rotates validation CA to a bundle with the new CA and the serving certificate to the one signed by the new CA,
+    while clients open new connections (handshakes) and send requests over kept-alive connections
+    """
+    stop = threading.Event()
+    with envoy.client(
+        verify=trusted,
+        cert=certificates["valid_cert"],
+        retry_policy=NO_RETRY,
+        limits=Limits(max_keepalive_connections=0),
+    ) as new_connections, envoy.client(
+        verify=trusted, cert=certificates["valid_cert"], retry_policy=NO_RETRY
+    ) as keepalive:
+        assert new_connections.get("/get").status_code == 200
+        with ThreadPoolExecutor(2) as executor:
+            handshakes = executor.submit(run_load, new_connections, concurrency=2, stop=stop)
+            requests = executor.submit(run_load, keepalive, concurrency=2, stop=stop)
+            time.sleep(WARMUP)
+
+            openshift.update_tls_secret(envoy_ca, trusted)
+            openshift.update_tls_secret(envoy_cert, certificates["rotated_cert"])
+            context = tls_context(trusted, certificates["valid_cert"])
+            served = wait_for_certificate(envoy.route.hostname, context, certificates["rotated_cert"], TIMEOUT)
+
+            time.sleep(COOLDOWN)
+            stop.set()
+        handshakes_result, requests_result = handshakes.result(), requests.result()
+
+    record_property("rotation_served_seconds", served if served is not None else TIMEOUT)
+    record_property("rotation_failed_handshakes", handshakes_result.errors)
+    record_property("rotation_connection_drops", requests_result.errors)
+    record_property("rotation_requests_per_second", requests_result.throughput)
+    logger.info(
+        "New certificate served after %s s, %d/%d failed new connections, %d/%d failed kept-alive requests",
+        served,
+        handshakes_result.errors,
+        handshakes_result.requests,
+        requests_result.errors,
+        requests_result.requests,
+    )
+
+    assert served is not None, "Envoy didn't serve the rotated certificate in time"
+    assert handshakes_result.errors == 0, "Some handshakes failed during the rotation"
+    assert requests_result.errors == 0, "Some connections were dropped during the rotation"
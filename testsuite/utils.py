@@ -2,12 +2,16 @@
 import enum
 import os
 import secrets
+import stat
+import tempfile
 from collections.abc import Collection
-from typing import Dict, Union
+from typing import Dict, Union, TYPE_CHECKING
 
 from testsuite.certificates import Certificate, CFSSLClient, CertInfo
-from testsuite.config import settings
-from testsuite.openshift.httpbin import Httpbin
+from testsuite.perf.cassette import CASSETTE
+
+if TYPE_CHECKING:
+    from testsuite.openshift.httpbin import Httpbin
 
 
 class ContentType(enum.Enum):
@@ -21,8 +25,8 @@ class ContentType(enum.Enum):
 
 
 def generate_tail(tail=5):
-    """Returns random suffix"""
-    return secrets.token_urlsafe(tail).translate(str.maketrans("", "", "-_")).lower()
+    """Returns random suffix, replayed run gets the same suffixes as the recorded one"""
+    return CASSETTE.value("tail", lambda: secrets.token_urlsafe(tail).translate(str.maketrans("", "", "-_")).lower())
 
 
 def randomize(name, tail=5):
@@ -30,8 +34,36 @@ def randomize(name, tail=5):
     return f"{name}-{generate_tail(tail)}"
 
 
+def worker_index() -> int:
+    """Returns index of the xdist worker (0 for gw0), 0 outside xdist"""
+    return int(os.environ.get("PYTEST_XDIST_WORKER", "gw0")[2:])
+
+
+def shard(pool: list):
+    """Returns item of the pool which belongs to this xdist worker"""
+    return pool[worker_index() % len(pool)]
+
+
+def private_tempdir() -> str:
+    """Returns temp directory of the current user, which is not accessible by other users"""
+    path = os.path.join(tempfile.gettempdir(), f"marin3r-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} has to be a directory accessible only by the current user")
+    return path
+
+
+def open_private(path: str):
+    """Opens file for reading and writing, creates it readable only by the current user if it doesn't exist"""
+    return os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), "r+", encoding="utf-8")
+
+
 def _whoami():
     """Returns username"""
+    # pylint: disable=import-outside-toplevel
+    from testsuite.config import settings
+
     if "tester" in settings:
         return settings["tester"]
 
@@ -71,10 +103,12 @@ def cert_builder(
             parsed_hosts = [parsed_hosts]  # type: ignore
 
         if info.ca or info.children:
-            cert = cfssl.create_authority(name, names=info.names, hosts=parsed_hosts, certificate_authority=parent)
+            cert = cfssl.create_authority(
+                name, names=info.names, hosts=parsed_hosts, certificate_authority=parent, key=info.key
+            )
         else:
             cert = cfssl.create(
-                name, names=info.names, hosts=parsed_hosts, certificate_authority=parent
+                name, names=info.names, hosts=parsed_hosts, certificate_authority=parent, key=info.key
             )  # type: ignore
         cert.chain = cert.certificate + parent.chain if parent else cert.certificate  # type: ignore
         if info.children is not None:
@@ -88,7 +122,7 @@ def rego_allow_header(key, value):
     return f'allow {{ input.context.request.http.headers.{key} == "{value}" }}'
 
 
-def create_simple_cluster(backend: Httpbin, name: str):
+def create_simple_cluster(backend: "Httpbin", name: str):
     """Generates a simple configuration for a envoy cluster pointing to a specific backend"""
     return {
         "name": name,